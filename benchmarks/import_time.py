@@ -0,0 +1,138 @@
+"""
+Import-time breakdown for the analysis scripts.
+
+Runs each target under `python -X importtime`, adds up the self time of
+every imported module and lists the most expensive top-level packages.
+Text-only targets also check that no plotting module was imported.
+
+    python benchmarks/import_time.py                       # print the breakdown
+    python benchmarks/import_time.py --json out.json       # save the results
+    python benchmarks/import_time.py --baseline out.json   # flag regressions
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WK7 = os.path.join(REPO, "wk-7-assignment")
+WK8 = os.path.join(REPO, "wk-8-assignment")
+
+PLOTTING = ("matplotlib", "seaborn")
+
+# name -> (working directory, python arguments, top-level packages that must not load)
+TARGETS = {
+    "gdp_text_report": (WK7, ["data_analysis.py", "--text"], PLOTTING),
+    "car_sales_text_report": (WK8, ["Frameworks_Assignment.py", "--text"], PLOTTING),
+    "car_sales_stream_report": (WK8, ["streaming_eda.py"], PLOTTING),
+    "car_sales_loader": (WK8, ["-c", "import car_data"], PLOTTING),
+    "dashboard_core": (WK8, ["-c", "import sales_cube, chart_cache, charts, filter_index, live_ingest, top_k"], PLOTTING),
+    "plotting_stack": (WK8, ["-c", "import matplotlib.pyplot, seaborn"], ()),
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output into {module: (self_us, cumulative_us, depth)}.
+
+    Lines look like 'import time:       123 |        456 |   package.module',
+    where the indentation of the name gives the nesting depth.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure(name, repeat=3):
+    """Best-of-`repeat` import profile for one target"""
+    cwd, args, forbidden = TARGETS[name]
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=cwd, capture_output=True, text=True,
+            env={**os.environ, "MPLBACKEND": "Agg", "TERM": "dumb"},
+        )
+        modules = parse_importtime(result.stderr)
+        total = sum(self_us for self_us, _, _ in modules.values())
+        if best is None or total < best["total_us"]:
+            top_level = {}
+            for module, (self_us, _, _) in modules.items():
+                package = module.split(".")[0]
+                top_level[package] = top_level.get(package, 0) + self_us
+            best = {
+                "total_us": total,
+                "modules": len(modules),
+                "packages": dict(sorted(top_level.items(), key=lambda kv: -kv[1])),
+                "forbidden_loaded": sorted(p for p in forbidden if p in top_level),
+                "returncode": result.returncode,
+            }
+    return best
+
+
+def print_breakdown(name, result, top=8):
+    print(f"\n=== {name}: {result['total_us'] / 1000:.1f} ms, {result['modules']} modules ===")
+    for package, self_us in list(result["packages"].items())[:top]:
+        print(f"  {package:<24} {self_us / 1000:>8.1f} ms")
+    if result["forbidden_loaded"]:
+        print(f"  !! loaded {', '.join(result['forbidden_loaded'])} (should stay lazy)")
+    if result["returncode"]:
+        print(f"  !! exited with code {result['returncode']}")
+
+
+def compare(results, baseline, tolerance):
+    """Targets whose import time grew by more than `tolerance` (a fraction) over the baseline"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["total_us"]
+        after = result["total_us"]
+        if before and (after - before) / before > tolerance:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the analysis scripts")
+    parser.add_argument("targets", nargs="*", metavar="TARGET", help=f"subset of: {', '.join(TARGETS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per target (best is kept)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.targets if name not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    results = {}
+    for name in args.targets or TARGETS:
+        results[name] = measure(name, args.repeat)
+        print_breakdown(name, results[name])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = any(r["forbidden_loaded"] or r["returncode"] for r in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name, before, after in compare(results, baseline, args.tolerance):
+            print(f"REGRESSION {name}: {before / 1000:.1f} ms -> {after / 1000:.1f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
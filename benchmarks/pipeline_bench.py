@@ -0,0 +1,353 @@
+"""
+Benchmarks for the car sales and GDP pipelines.
+
+Generates synthetic tables with the same schema as car_sales_data.csv and
+CountryGDP-2020-2025.csv, then times each stage the scripts perform. Every
+size runs in a fresh process, so its peak RSS is not polluted by earlier
+runs. The peak RSS is a high-water mark for the whole run of one size, so
+it is compared per dataset, not per stage.
+
+    python benchmarks/pipeline_bench.py run --sizes 50000 1000000 --out new.json
+    python benchmarks/pipeline_bench.py compare old.json new.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WK7 = os.path.join(REPO, "wk-7-assignment")
+WK8 = os.path.join(REPO, "wk-8-assignment")
+DATA_DIR = os.path.join(REPO, "benchmarks", ".data")
+
+# Same makes and models as car_sales_data.csv
+MODELS = {
+    "Ford": ["Fiesta", "Focus", "Mondeo"],
+    "VW": ["Golf", "Polo", "Passat"],
+    "Toyota": ["RAV4", "Prius", "Yaris"],
+    "BMW": ["M5", "X3", "Z4"],
+    "Porsche": ["718 Cayman", "911", "Cayenne"],
+}
+MAKE_WEIGHTS = [0.30, 0.29, 0.25, 0.10, 0.06]
+FUEL_TYPES = ["Petrol", "Diesel", "Hybrid"]
+FUEL_WEIGHTS = [0.51, 0.28, 0.21]
+ENGINE_SIZES = [1.0, 1.2, 1.4, 1.6, 1.8, 2.0, 2.2, 2.4, 2.6, 3.0, 3.5, 4.0, 4.4, 5.0]
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far, or None if unknown.
+
+    This is a running maximum: it never goes down, so the value after a
+    stage includes every stage before it.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    peak = getattr(psutil.Process().memory_info(), "peak_wset", None)  # Windows
+    return peak / (1024 * 1024) if peak is not None else None
+
+
+# ---- synthetic data ----
+
+def make_car_sales(rows, seed=0):
+    """Synthetic car sales frame with the car_sales_data.csv schema"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    makes = list(MODELS)
+    make_idx = rng.choice(len(makes), size=rows, p=MAKE_WEIGHTS)
+    model_idx = rng.integers(0, 3, size=rows)
+    model_names = np.array([MODELS[m] for m in makes], dtype=object)
+    year = rng.integers(1984, 2023, size=rows)
+    age = 2023 - year
+    mileage = np.maximum(rng.normal(age * 7000, age * 2000 + 500), 500).astype(np.int64)
+    engine = rng.choice(ENGINE_SIZES, size=rows)
+    base = 30000 * (1 + make_idx * 0.4) * engine / 2
+    price = np.maximum(base * np.exp(-age / 8) - mileage * 0.02 + rng.normal(0, 2000, rows), 76)
+    return pd.DataFrame(
+        {
+            "Manufacturer": np.array(makes, dtype=object)[make_idx],
+            "Model": model_names[make_idx, model_idx],
+            "Engine size": engine,
+            "Fuel type": rng.choice(FUEL_TYPES, size=rows, p=FUEL_WEIGHTS),
+            "Year of manufacture": year,
+            "Mileage": mileage,
+            "Price": price.astype(np.int64),
+        }
+    )
+
+
+def make_gdp_panel(countries, years=6, seed=0):
+    """Synthetic GDP frame shaped like CountryGDP-2020-2025.csv (with trailing gaps)"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    start = rng.lognormal(10.5, 2.0, size=countries)
+    growth = rng.normal(0.04, 0.05, size=(countries, years - 1))
+    values = start[:, None] * np.concatenate([np.ones((countries, 1)), np.cumprod(1 + growth, axis=1)], axis=1)
+    values = values.round()
+    # About 4% of rows stop reporting early, like the real file
+    stops = rng.random(countries) < 0.04
+    cut = rng.integers(1, years, size=countries)
+    values[stops[:, None] & (np.arange(years) >= cut[:, None])] = np.nan
+    df = pd.DataFrame(values, columns=[str(2020 + i) for i in range(years)])
+    df.insert(0, "Country", [f"Country {i:06d}" for i in range(countries)])
+    return df
+
+
+def cached_csv(kind, size):
+    """Write the synthetic CSV once per (kind, size) and reuse it on later runs"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"{kind}-{size}.csv")
+    if not os.path.exists(path):
+        df = make_car_sales(size) if kind == "car_sales" else make_gdp_panel(size)
+        df.to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+# ---- stages ----
+
+def _time(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _figure_png(draw):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    draw(ax)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return len(buffer.getvalue())
+
+
+def bench_car_sales(rows, repeat):
+    """Time every stage of Frameworks_Assignment.py / streamlit_app.py for one table size"""
+    sys.path.insert(0, WK8)
+    import numpy as np
+    import pandas as pd
+
+    from car_data import read_car_sales_csv
+    from charts import plot_price_vs_mileage
+    from sales_cube import SalesCube
+    from top_k import top_k_counts
+
+    path = cached_csv("car_sales", rows)
+    stages = {}
+
+    def record(name, fn):
+        seconds, result = _time(fn, repeat)
+        stages[name] = {"seconds": seconds, "cumulative_peak_rss_mb": peak_rss_mb()}
+        return result
+
+    record("load_csv_default", lambda: pd.read_csv(path))
+    df = record("load_csv_typed", lambda: read_car_sales_csv(path))
+
+    def mask():
+        years = df["Year of manufacture"]
+        keep = (years >= 2000) & (years <= 2022) & df["Manufacturer"].isin(["Ford", "VW", "BMW"])
+        return df[keep]
+
+    filtered = record("filter_mask", mask)
+    record("value_counts_year", lambda: df["Year of manufacture"].value_counts().sort_index())
+    record("value_counts_model_top10", lambda: df["Model"].value_counts().head(10))
+    record(
+        "groupby_make_model_top10",
+        lambda: df.groupby(["Manufacturer", "Model"], observed=True).size().sort_values(ascending=False).head(10),
+    )
+    record("top_k_exact", lambda: top_k_counts(df[["Manufacturer", "Model"]], 10))
+    record("corr_price_mileage", lambda: filtered["Price"].corr(filtered["Mileage"]))
+    record("polyfit_price_mileage", lambda: np.polyfit(filtered["Mileage"], filtered["Price"], 1))
+
+    cube = record("cube_build", lambda: SalesCube.from_frame(df))
+
+    def cube_query():
+        selection = cube.filter((2000, 2022), ["Ford", "VW", "BMW"])
+        return (
+            selection.count(),
+            selection.mean_price(),
+            selection.yearly_counts(),
+            selection.top_models(10),
+            selection.correlation(),
+        )
+
+    record("cube_query", cube_query)
+
+    def draw_price_vs_mileage(ax):
+        plot_price_vs_mileage(ax, filtered["Mileage"], filtered["Price"], filtered["Engine size"])
+
+    def draw_yearly_bar(ax):
+        yearly = filtered["Year of manufacture"].value_counts().sort_index()
+        ax.bar(yearly.index, yearly.values)
+
+    _figure_png(lambda ax: None)  # warm up: keep the matplotlib import out of the timings
+    record("render_price_vs_mileage", lambda: _figure_png(draw_price_vs_mileage))
+    record("render_yearly_bar", lambda: _figure_png(draw_yearly_bar))
+    return {"rows": rows, "stages": stages, "peak_rss_mb": peak_rss_mb()}
+
+
+def bench_gdp(countries, repeat):
+    """Time every stage of data_analysis.py for one panel size"""
+    sys.path.insert(0, WK7)
+    import pandas as pd
+
+    from gdp_panel import GDPPanel
+
+    path = cached_csv("gdp", countries)
+    stages = {}
+
+    def record(name, fn):
+        seconds, result = _time(fn, repeat)
+        stages[name] = {"seconds": seconds, "cumulative_peak_rss_mb": peak_rss_mb()}
+        return result
+
+    df = record("load_csv", lambda: pd.read_csv(path))
+    record("fill_pandas_axis1", lambda: df.ffill(axis=1).bfill(axis=1))
+    panel = record("panel_build", lambda: GDPPanel.from_frame(df))
+    filled = record("fill_panel_ffill", lambda: panel.fill("ffill"))
+    record("fill_panel_cagr", lambda: panel.fill("cagr"))
+    latest = filled.periods[-1]
+    filled_df = filled.to_frame()
+    record("top5_pandas_nlargest", lambda: filled_df.nlargest(5, latest))
+    record("top5_panel_argpartition", lambda: filled.top_n(5, latest))
+    record(
+        "group_first_letter_pandas",
+        lambda: filled_df.groupby(filled_df["Country"].str[0])[latest].mean(),
+    )
+    record("group_first_letter_panel", lambda: filled.group_aggregate(filled.first_letter_keys(), latest))
+    _figure_png(lambda ax: None)  # warm up: keep the matplotlib import out of the timings
+    record(
+        "render_histogram",
+        lambda: _figure_png(lambda ax: ax.hist(filled.column(latest), bins=20)),
+    )
+    return {"rows": countries, "stages": stages, "peak_rss_mb": peak_rss_mb()}
+
+
+BENCHES = {"car_sales": bench_car_sales, "gdp": bench_gdp}
+
+
+def _mb(value):
+    return f"{value:>8.0f} MB" if value is not None else f"{'n/a':>11}"
+
+
+def run(car_sizes, gdp_sizes, repeat):
+    results = {}
+    jobs = [("car_sales", size) for size in car_sizes] + [("gdp", size) for size in gdp_sizes]
+    for kind, size in jobs:
+        print(f"- {kind} {size:,} rows ...", flush=True)
+        # A fresh process per size keeps the peak RSS numbers independent
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results[f"{kind}:{size}"] = pool.submit(BENCHES[kind], size, repeat).result()
+        result = results[f"{kind}:{size}"]
+        for stage, numbers in result["stages"].items():
+            print(f"    {stage:<28} {numbers['seconds'] * 1000:>10.1f} ms  {_mb(numbers['cumulative_peak_rss_mb'])}")
+        print(f"    {'peak RSS (whole run)':<28} {'':>13}  {_mb(result['peak_rss_mb'])}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=0.10, min_seconds=0.001):
+    """
+    Stages that got slower, and datasets that used more memory, by more than `threshold`.
+
+    Stages faster than min_seconds in both runs are ignored, they are noise.
+    Memory is the peak RSS of the whole run, reported with the stage "*",
+    because a running maximum cannot be attributed to one stage.
+    Returns a list of (dataset, stage, metric, old value, new value).
+    """
+    regressions = []
+    for dataset, new_result in new["results"].items():
+        old_result = old["results"].get(dataset)
+        if old_result is None:
+            continue
+        for stage, after in new_result["stages"].items():
+            before = old_result["stages"].get(stage)
+            if before is None:
+                continue
+            if max(before["seconds"], after["seconds"]) >= min_seconds and (
+                after["seconds"] > before["seconds"] * (1 + threshold)
+            ):
+                regressions.append((dataset, stage, "seconds", before["seconds"], after["seconds"]))
+        before, after = old_result["peak_rss_mb"], new_result["peak_rss_mb"]
+        if before is not None and after is not None and after > before * (1 + threshold):
+            regressions.append((dataset, "*", "peak_rss_mb", before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load/filter/aggregate/render benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=[50_000, 1_000_000],
+                            help="car sales row counts")
+    run_parser.add_argument("--gdp-sizes", nargs="+", type=int, default=[200, 100_000],
+                            help="GDP panel country counts")
+    run_parser.add_argument("--repeat", type=int, default=3, help="runs per stage (best is kept)")
+    run_parser.add_argument("--out", default="bench_results.json")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two runs")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.1 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.sizes, args.gdp_sizes, args.repeat)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+        return 0
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(old, new, args.threshold)
+    for dataset, stage, metric, before, after in regressions:
+        print(f"REGRESSION {dataset} {stage} {metric}: {before:.4g} -> {after:.4g}")
+    if not regressions:
+        print("No regressions.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
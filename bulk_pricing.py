@@ -0,0 +1,121 @@
+#Bulk pricing: the calculate_discount rule applied to whole arrays / CSV columns
+#Same rule as discount.py: no discount below 20%, otherwise the price drops by
+#discount_percent percent. calculate_discounts() does it for a NumPy array in
+#one go; reprice_csv() streams a CSV in chunks, so files with millions of rows
+#never have to fit in memory.
+#
+#    python bulk_pricing.py wk-8-assignment/car_sales_data.csv repriced.csv --discount 25
+#----------------------------------------------------------------------------------
+
+import argparse
+import csv
+import io
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from discount import MIN_DISCOUNT_PERCENT
+
+
+def calculate_discounts(prices, discount_percent, min_percent=MIN_DISCOUNT_PERCENT):
+    """
+    Vectorised calculate_discount: prices and discount_percent are arrays or scalars
+    (broadcast against each other). Returns float64 final prices.
+
+    Uses the same operations in the same order as the scalar function, so each
+    result is exactly what calculate_discount would return for that item.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    discount_percent = np.asarray(discount_percent, dtype=np.float64)
+    discounted = prices - prices * (discount_percent / 100)
+    return np.where(discount_percent >= min_percent, discounted, prices)
+
+
+def iter_discounted(path, discount_percent, column="Price", chunksize=1_000_000):
+    """Yield (chunk, final prices) for each chunk of a CSV"""
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield chunk, calculate_discounts(chunk[column].to_numpy(), discount_percent)
+
+
+def append_price_column(src, dst, usecols, compute, column="Price", output_column=None, chunksize=1_000_000, decimals=2):
+    """
+    Copy src to dst with a computed price column appended, one chunk at a time.
+
+    Every input line is copied as-is with ",<new price>" added. Only `usecols`
+    are parsed (by pandas, from the chunk's raw bytes) and passed to
+    compute(frame) -> new prices. That is several times faster than parsing
+    and re-writing every column. The file must have one record per line (no
+    quoted line breaks).
+
+    Returns {"rows", "total_before", "total_after"} (totals of `column` and of the new prices).
+    Raises ValueError, before dst is created, when src lacks one of `usecols`.
+    """
+    output_column = output_column or f"Discounted {column.lower()}"
+    value_format = f"%.{decimals}f"
+    summary = {"rows": 0, "total_before": 0.0, "total_after": 0.0}
+    with open(src, "rb") as f:
+        header = f.readline()
+        names = next(csv.reader([header.decode()]), [])
+        missing = [name for name in usecols if name not in names]
+        if missing:
+            raise ValueError(f"Error: Column(s) {', '.join(map(repr, missing))} not found in '{src}'!")
+        positions = [names.index(name) for name in usecols]
+        with open(dst, "wb") as out:
+            out.write(header.rstrip(b"\r\n") + f",{output_column}\n".encode())
+            while True:
+                lines = [line for line in itertools.islice(f, chunksize) if line.strip()]
+                if not lines:
+                    break
+                frame = pd.read_csv(io.BytesIO(b"".join(lines)), header=None, usecols=positions)
+                frame.columns = [names[i] for i in frame.columns]
+                final = compute(frame)
+                summary["rows"] += len(lines)
+                summary["total_before"] += float(frame[column].sum())
+                summary["total_after"] += float(final.sum())
+                values = [(value_format % value).encode() for value in final.tolist()]
+                out.write(b"".join(line.rstrip(b"\r\n") + b"," + value + b"\n" for line, value in zip(lines, values)))
+    return summary
+
+
+def reprice_csv(src, dst, discount_percent, column="Price", output_column=None, chunksize=1_000_000, decimals=2):
+    """Copy src to dst with the discounted `column` appended (see append_price_column)"""
+    return append_price_column(
+        src, dst, [column], lambda frame: calculate_discounts(frame[column].to_numpy(), discount_percent),
+        column, output_column, chunksize, decimals,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply the discount rule to a price column of a CSV")
+    parser.add_argument("src", help="input CSV")
+    parser.add_argument("dst", help="output CSV (input columns plus the discounted price)")
+    parser.add_argument("--discount", type=float, required=True, help="discount percentage")
+    parser.add_argument("--column", default="Price", help="price column (default: Price)")
+    parser.add_argument("--output-column", help="name of the new column (default: 'Discounted price')")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="rows per chunk")
+    args = parser.parse_args(argv)
+
+    if args.discount < MIN_DISCOUNT_PERCENT:
+        print(f"No discount applied (discount must be {MIN_DISCOUNT_PERCENT}% or higher)")
+
+    start = time.perf_counter()
+    try:
+        summary = reprice_csv(args.src, args.dst, args.discount, args.column, args.output_column, args.chunksize)
+    except FileNotFoundError as error:
+        print(f"Error: File '{error.filename}' not found!")
+        return
+    except ValueError as error:
+        print(error)
+        return
+    elapsed = time.perf_counter() - start
+
+    print(f"Re-priced {summary['rows']:,} rows in {elapsed:.2f} s ({summary['rows'] / elapsed:,.0f} rows/s)")
+    print(f"Total before: {summary['total_before']:,.2f}")
+    print(f"Total after:  {summary['total_after']:,.2f}")
+    print(f"Written to {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
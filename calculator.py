@@ -1,3 +1,21 @@
+import argparse
+import os
+import sys
+import time
+
+DIVISION_BY_ZERO = "Error: Division by zero is not allowed!"
+INVALID_OPERATION = "Error: Invalid operation! Please use +, -, *, or /"
+
+
+def file_error(path, error):
+  """Message for a file that cannot be read, worded like the week-4 assignment"""
+  if isinstance(error, FileNotFoundError):
+    return f"Error: File '{path}' not found!"
+  if isinstance(error, PermissionError):
+    return f"Error: No permission to read '{path}'!"
+  return f"Error: Could not read '{path}': {error}"
+
+
 def calculator():
   num1 = float(input("Enter the first number: "))
   num2 = float(input("Enter the second number: "))
@@ -11,12 +29,107 @@ def calculator():
     result = num1 * num2
   elif operation == '/':
     if num2 == 0:
-      print("Error: Division by zero is not allowed!")
+      print(DIVISION_BY_ZERO)
       return
     result = num1 / num2
   else:
-    print("Error: Invalid operation! Please use +, -, *, or /")
+    print(INVALID_OPERATION)
     return
   print(f"{num1} {operation} {num2} = {result}")
 
-calculator()
\ No newline at end of file
+
+# Batch mode: many expressions, or one formula over the columns of a CSV
+#   python calculator.py expressions.txt        (one expression per line, "-" for stdin)
+#   python calculator.py --csv wk-8-assignment/car_sales_data.csv --formula "Price / Mileage" --output out.csv
+def batch(argv):
+  from expressions import ERROR_MESSAGES, OK, ExpressionError, compile_expression, evaluate_lines
+
+  parser = argparse.ArgumentParser(description="Evaluate expressions in batch (no arguments: interactive calculator)")
+  parser.add_argument("expressions", nargs="?", help="file with one expression per line, or - for stdin")
+  parser.add_argument("--csv", help="evaluate --formula for every row of this CSV")
+  parser.add_argument("--formula", help="expression over CSV columns, e.g. \"Price / [Engine size]\"")
+  parser.add_argument("--output", help="write the results of --formula to this CSV")
+  parser.add_argument("--chunksize", type=int, default=1_000_000, help="CSV rows per chunk")
+  args = parser.parse_args(argv)
+
+  if args.expressions:
+    try:
+      lines = sys.stdin if args.expressions == "-" else open(args.expressions)
+    except OSError as error:
+      print(file_error(args.expressions, error))
+      return
+    try:
+      for text, result, error in evaluate_lines(lines):
+        print(error if error else f"{text} = {result}")
+    finally:
+      if lines is not sys.stdin:  # only close what was opened here
+        lines.close()
+    return
+
+  if not (args.csv and args.formula):
+    parser.error("give an expressions file, or --csv with --formula")
+  import pandas as pd
+
+  try:
+    program = compile_expression(args.formula)
+  except ExpressionError as error:
+    print(error)
+    return
+  try:
+    header = pd.read_csv(args.csv, nrows=0).columns
+  except (OSError, ValueError) as error:  # pandas' EmptyDataError is a ValueError
+    print(file_error(args.csv, error))
+    return
+  missing = [name for name in program.variables if name not in header]
+  if missing:
+    print(f"Error: Unknown column(s) {', '.join(missing)} in '{args.csv}'")
+    return
+  usecols = list(program.variables) or [header[0]]  # a constant formula still needs the row count
+  start = time.perf_counter()
+  rows = failed = 0
+  total = 0.0
+  # Results go to a temporary file that replaces --output only when every row was read
+  partial = f"{args.output}.{os.getpid()}.tmp" if args.output else None
+  out = open(partial, "w") if partial else None
+  complete = False
+  try:
+    if out:
+      out.write(f"{args.formula}\n")
+    for chunk in pd.read_csv(args.csv, usecols=usecols, chunksize=args.chunksize):
+      for name in program.variables:
+        numbers = pd.to_numeric(chunk[name], errors="coerce")
+        bad = (numbers.isna() & chunk[name].notna()).to_numpy().nonzero()[0]
+        if len(bad):
+          print(f"Error: Column '{name}' is not numeric (row {rows + bad[0]}: {chunk[name].iloc[bad[0]]!r})")
+          return
+        chunk[name] = numbers
+      values, errors = program.evaluate_columns(chunk)
+      bad = errors != OK
+      for i in bad.nonzero()[0][:max(0, 10 - failed)].tolist():
+        print(f"Row {rows + i}: {ERROR_MESSAGES[errors[i]]}")  # the first few, not millions
+      rows += len(values)
+      failed += int(bad.sum())
+      total += float(values[~bad].sum())
+      if out:
+        text = values.astype(str)
+        text[bad] = ""
+        out.write("\n".join(text.tolist()) + "\n")
+    complete = True
+  finally:
+    if out:
+      out.close()
+      if complete:
+        os.replace(partial, args.output)
+      else:
+        os.remove(partial)
+  elapsed = time.perf_counter() - start
+  print(f"Evaluated {args.formula!r} for {rows:,} rows in {elapsed:.2f} s ({failed:,} errors)")
+  if rows > failed:
+    print(f"Mean: {total / (rows - failed):,.4f}")
+
+
+if __name__ == "__main__":
+  if len(sys.argv) > 1:
+    batch(sys.argv[1:])
+  else:
+    calculator()
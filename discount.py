@@ -1,5 +1,8 @@
-def calculate_discount(price, discount_percent):
-    if discount_percent >= 20:
+MIN_DISCOUNT_PERCENT = 20  # smaller discounts are not applied
+
+
+def calculate_discount(price, discount_percent, min_percent=MIN_DISCOUNT_PERCENT):
+    if discount_percent >= min_percent:
         discount_amount = price * (discount_percent / 100)
         final_price = price - discount_amount
         return final_price
@@ -17,13 +20,13 @@ def main():
         final_price = calculate_discount(original_price, discount_percentage)
         
         # Display the result
-        if discount_percentage >= 20:
+        if discount_percentage >= MIN_DISCOUNT_PERCENT:
             discount_amount = original_price - final_price
             print(f"\nDiscount applied: {discount_percentage}%")
             print(f"Discount amount: {discount_amount:.2f}")
             print(f"Final price: {final_price:.2f}")
         else:
-            print(f"No discount applied (discount must be 20% or higher)")
+            print(f"No discount applied (discount must be {MIN_DISCOUNT_PERCENT}% or higher)")
             print(f"Original price: {final_price:.2f}")
             
     except ValueError:
@@ -0,0 +1,306 @@
+#Discount rules: tiered, stacked and scoped promotions compiled to lookup tables
+#A rule gives `percent` off to cars whose price is in [min_price, max_price),
+#optionally only for one manufacturer and/or fuel type, and only between its
+#start and end dates (inclusive). For each car:
+#  - of the matching non-stacking rules the best one applies (tiers)
+#  - matching stacking rules are applied on top, one after another
+#  - the combined discount follows the calculate_discount rule, so it is only
+#    given when it reaches min_percent (20% by default)
+#
+#Rules are compiled for one date into sorted price breakpoints per
+#(manufacturer, fuel type) scope; each price is then resolved with
+#np.searchsorted instead of checking every rule. Compiled rule sets are
+#cached in memory (the most recent few) and on disk (.discount_cache next to
+#this file, or --cache-dir), keyed on the rules' contents and the date.
+#
+#    python discount_rules.py rules.json wk-8-assignment/car_sales_data.csv out.csv --date 2026-11-27
+#----------------------------------------------------------------------------------
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from bulk_pricing import append_price_column, calculate_discounts
+from discount import MIN_DISCOUNT_PERCENT
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".discount_cache")
+MEMORY_CACHE_SIZE = 16  # compiled rule sets kept in memory
+ANY = "*"  # rule scope that matches every manufacturer / fuel type
+
+RULE_DEFAULTS = {
+    "name": None,
+    "percent": 0.0,
+    "min_price": 0.0,
+    "max_price": float("inf"),
+    "manufacturer": None,
+    "fuel_type": None,
+    "start": None,  # "YYYY-MM-DD", inclusive
+    "end": None,  # "YYYY-MM-DD", inclusive
+    "stack": False,  # applied on top of the best tier instead of competing with it
+}
+
+
+def normalise_rule(rule):
+    """Fill in defaults and check one rule dict"""
+    unknown = set(rule) - set(RULE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown rule field(s) {sorted(unknown)} in {rule}")
+    rule = {**RULE_DEFAULTS, **rule}
+    if not 0 <= float(rule["percent"]) <= 100:
+        raise ValueError(f"Rule percent must be between 0 and 100: {rule}")
+    if float(rule["min_price"]) >= float(rule["max_price"]):
+        raise ValueError(f"Rule min_price must be below max_price: {rule}")
+    return rule
+
+
+def load_rules(path):
+    """Rules from a JSON file holding a list of rule objects"""
+    with open(path) as f:
+        return [normalise_rule(rule) for rule in json.load(f)]
+
+
+def _active(rule, day):
+    start, end = rule["start"], rule["end"]
+    if start is not None and day < datetime.date.fromisoformat(start):
+        return False
+    if end is not None and day > datetime.date.fromisoformat(end):
+        return False
+    return True
+
+
+def rules_key(rules, day, min_percent):
+    """Content hash of a rule set for one date, for the caches"""
+    blob = json.dumps([rules, str(day), min_percent], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class CompiledRules:
+    """
+    A rule set resolved for one date.
+
+    For each scope (manufacturer or ANY, fuel type or ANY) there is a sorted
+    array of price breakpoints and, per price band between breakpoints, the
+    best tier percent and the product of the stacking multipliers. A car is
+    looked up in at most four scopes: its own manufacturer and fuel type,
+    each of them with ANY, and ANY/ANY. Those are merged into one table per
+    pair on first use, so pricing a car is a single binary search.
+    """
+
+    def __init__(self, scopes, min_percent=MIN_DISCOUNT_PERCENT):
+        self.scopes = scopes  # (manufacturer, fuel type) -> (edges, best percent, stack multiplier)
+        self.min_percent = min_percent
+        self._tables = {}  # merged tables per (manufacturer, fuel type), see table()
+
+    @classmethod
+    def compile(cls, rules, day=None, min_percent=MIN_DISCOUNT_PERCENT):
+        day = day or datetime.date.today()
+        grouped = {}
+        for rule in rules:
+            if _active(rule, day):
+                scope = (rule["manufacturer"] or ANY, rule["fuel_type"] or ANY)
+                grouped.setdefault(scope, []).append(rule)
+
+        scopes = {}
+        for scope, scope_rules in grouped.items():
+            lows = np.array([float(r["min_price"]) for r in scope_rules])
+            highs = np.array([float(r["max_price"]) for r in scope_rules])
+            percents = np.array([float(r["percent"]) for r in scope_rules])
+            stacking = np.array([bool(r["stack"]) for r in scope_rules])
+
+            # Band i is [edges[i - 1], edges[i]); band 0 is below every rule
+            edges = np.unique(np.concatenate([lows, highs]))
+            best = np.zeros(len(edges) + 1)
+            multiplier = np.ones(len(edges) + 1)
+            first = np.searchsorted(edges, lows, side="right")
+            last = np.searchsorted(edges, highs, side="right")
+            for lo, hi, percent, stack in zip(first.tolist(), last.tolist(), percents.tolist(), stacking.tolist()):
+                if stack:
+                    multiplier[lo:hi] *= 1 - percent / 100
+                else:
+                    np.maximum(best[lo:hi], percent, out=best[lo:hi])
+            scopes[scope] = (edges, best, multiplier)
+        return cls(scopes, min_percent)
+
+    def table(self, manufacturer, fuel_type):
+        """
+        One (edges, best, multiplier) table for a manufacturer / fuel type pair.
+
+        Merges the up to four scopes that apply to such a car, so a price needs
+        a single searchsorted. Built on first use and kept.
+        """
+        key = (manufacturer, fuel_type)
+        if key not in self._tables:
+            parts = [
+                self.scopes[scope]
+                for scope in {(manufacturer, fuel_type), (manufacturer, ANY), (ANY, fuel_type), (ANY, ANY)}
+                if scope in self.scopes
+            ]
+            edges = np.unique(np.concatenate([part[0] for part in parts])) if parts else np.empty(0)
+            # Every merged band lies inside one band of each scope; look it up by its lower edge
+            lower = np.concatenate([[-np.inf], edges])
+            best = np.zeros(len(edges) + 1)
+            multiplier = np.ones(len(edges) + 1)
+            for scope_edges, scope_best, scope_multiplier in parts:
+                band = np.searchsorted(scope_edges, lower, side="right")
+                np.maximum(best, scope_best[band], out=best)
+                multiplier *= scope_multiplier[band]
+            self._tables[key] = (edges, best, multiplier)
+        return self._tables[key]
+
+    def percents(self, prices, manufacturers=None, fuel_types=None):
+        """Combined discount percent for every price"""
+        prices = np.asarray(prices, dtype=np.float64)
+        n = len(prices)
+        manufacturer_codes, manufacturer_values = pd.factorize(np.full(n, ANY, dtype=object) if manufacturers is None else manufacturers)
+        fuel_codes, fuel_values = pd.factorize(np.full(n, ANY, dtype=object) if fuel_types is None else fuel_types)
+
+        # Group the rows by (manufacturer, fuel type), then one lookup per group
+        pair = manufacturer_codes.astype(np.int64) * (len(fuel_values) + 1) + fuel_codes
+        order = np.argsort(pair, kind="stable")
+        bounds = np.flatnonzero(np.diff(pair[order])) + 1
+        percents = np.empty(n)
+        for rows in np.split(order, bounds):
+            if not len(rows):
+                continue
+            m, f = manufacturer_codes[rows[0]], fuel_codes[rows[0]]
+            edges, best, multiplier = self.table(
+                manufacturer_values[m] if m >= 0 else None, fuel_values[f] if f >= 0 else None
+            )
+            band = np.searchsorted(edges, prices[rows], side="right")
+            percents[rows] = 100 * (1 - (1 - best[band] / 100) * multiplier[band])
+        return percents
+
+    def apply(self, prices, manufacturers=None, fuel_types=None):
+        """Final prices (the calculate_discount rule with the combined percent)"""
+        percents = self.percents(prices, manufacturers, fuel_types)
+        return calculate_discounts(prices, percents, self.min_percent)
+
+    def save(self, path):
+        arrays = {}
+        meta = {"min_percent": self.min_percent, "scopes": []}
+        for i, (scope, (edges, best, multiplier)) in enumerate(self.scopes.items()):
+            meta["scopes"].append(list(scope))
+            arrays[f"edges_{i}"], arrays[f"best_{i}"], arrays[f"multiplier_{i}"] = edges, best, multiplier
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            scopes = {
+                tuple(scope): (data[f"edges_{i}"], data[f"best_{i}"], data[f"multiplier_{i}"])
+                for i, scope in enumerate(meta["scopes"])
+            }
+        return cls(scopes, meta["min_percent"])
+
+
+_compiled = OrderedDict()  # in-process cache: rules_key -> CompiledRules, least recently used first
+
+
+def compile_rules(rules, day=None, min_percent=MIN_DISCOUNT_PERCENT, cache_dir=CACHE_DIR):
+    """CompiledRules for the date, from the in-memory or on-disk cache when possible"""
+    day = day or datetime.date.today()
+    rules = [normalise_rule(rule) for rule in rules]
+    key = rules_key(rules, day, min_percent)
+    if key in _compiled:
+        _compiled.move_to_end(key)
+        return _compiled[key]
+
+    path = os.path.join(cache_dir, f"{key[:24]}.npz") if cache_dir else None
+    compiled = None
+    if path and os.path.exists(path):
+        try:
+            compiled = CompiledRules.load(path)
+        except (OSError, ValueError, KeyError):
+            compiled = None  # unreadable cache file, compile again
+    if compiled is None:
+        compiled = CompiledRules.compile(rules, day, min_percent)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            compiled.save(path)
+    _compiled[key] = compiled
+    if len(_compiled) > MEMORY_CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
+
+
+def random_rules(count, seed=0):
+    """Synthetic promotions over the car sales columns, for benchmarks"""
+    rng = np.random.default_rng(seed)
+    manufacturers = [None, "Ford", "VW", "Toyota", "BMW", "Porsche"]
+    fuel_types = [None, "Petrol", "Diesel", "Hybrid"]
+    rules = []
+    for i in range(count):
+        low = float(rng.integers(0, 80_000))
+        rules.append({
+            "name": f"promo-{i}",
+            "percent": float(rng.integers(5, 40)),
+            "min_price": low,
+            "max_price": low + float(rng.integers(1_000, 40_000)),
+            "manufacturer": manufacturers[rng.integers(len(manufacturers))],
+            "fuel_type": fuel_types[rng.integers(len(fuel_types))],
+            "start": f"2026-{rng.integers(1, 7):02d}-01",
+            "end": f"2026-{rng.integers(7, 13):02d}-28",
+            "stack": bool(rng.random() < 0.1),
+        })
+    return rules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-price car sales with a set of discount rules")
+    parser.add_argument("rules", help="JSON list of rules, or 'random:N' for N synthetic rules")
+    parser.add_argument("src", help="input CSV with Price, Manufacturer and Fuel type columns")
+    parser.add_argument("dst", help="output CSV (input columns plus the discounted price)")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="evaluate the rules on this date (YYYY-MM-DD, default today)")
+    parser.add_argument("--min-percent", type=float, default=MIN_DISCOUNT_PERCENT,
+                        help="smallest combined discount that is applied")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="rows per chunk")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="directory for compiled rule sets, '' for none (default: .discount_cache by this script)")
+    args = parser.parse_args(argv)
+
+    if args.rules.startswith("random:"):
+        rules = random_rules(int(args.rules.split(":", 1)[1]))
+    else:
+        rules = load_rules(args.rules)
+
+    start = time.perf_counter()
+    compiled = compile_rules(rules, args.date, args.min_percent, args.cache_dir)
+    compile_time = time.perf_counter() - start
+
+    def compute(frame):
+        return compiled.apply(frame["Price"].to_numpy(), frame["Manufacturer"].to_numpy(), frame["Fuel type"].to_numpy())
+
+    start = time.perf_counter()
+    try:
+        summary = append_price_column(
+            args.src, args.dst, ["Price", "Manufacturer", "Fuel type"], compute, chunksize=args.chunksize
+        )
+    except FileNotFoundError as error:
+        print(f"Error: File '{error.filename}' not found!")
+        return
+    except ValueError as error:
+        print(error)
+        return
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(rules):,} rules compiled for {args.date} in {compile_time * 1000:.1f} ms "
+          f"({len(compiled.scopes)} scopes)")
+    print(f"Re-priced {summary['rows']:,} rows in {elapsed:.2f} s")
+    print(f"Total before: {summary['total_before']:,.2f}")
+    print(f"Total after:  {summary['total_after']:,.2f}")
+    print(f"Written to {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
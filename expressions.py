@@ -0,0 +1,289 @@
+#Expressions: the calculator's + - * / for whole files and columns of numbers
+#An expression such as "(Price - 500) / [Engine size]" is parsed once into a
+#small stack program (kept in a cache), which can then be run for one set of
+#values or for NumPy columns with millions of rows in one go. Division by zero
+#and invalid operations give the same messages as calculator.py, per row.
+#
+#    program = compile_expression("Price / Mileage")
+#    values, errors = program.evaluate_columns(frame)
+#----------------------------------------------------------------------------------
+
+import functools
+import re
+
+import numpy as np
+
+from calculator import DIVISION_BY_ZERO, INVALID_OPERATION
+
+# Opcodes of a compiled program; each instruction is (opcode, argument)
+CONST, LOAD, NEG, ADD, SUB, MUL, DIV = range(7)
+OPERATORS = {"+": ADD, "-": SUB, "*": MUL, "/": DIV}
+PRECEDENCE = {ADD: 1, SUB: 1, MUL: 2, DIV: 2}
+
+MISSING_VALUE = "Error: Missing value!"
+
+# Per-row error codes of the batch functions -> message (OK rows have no message)
+OK, ZERO_DIVISION, INVALID, MISSING = range(4)
+ERROR_MESSAGES = (None, DIVISION_BY_ZERO, INVALID_OPERATION, MISSING_VALUE)
+
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*|\[[^\]]+\])"  # [..] for column names with spaces
+    r"|(?P<symbol>[-+*/()])"
+    r"|(?P<other>\S))"
+)
+
+
+class ExpressionError(ValueError):
+    """An expression that cannot be compiled; str() is the message to show"""
+
+
+def _tokens(text):
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        position = match.end()
+        if match["number"]:
+            yield "number", float(match["number"])
+        elif match["name"]:
+            yield "name", match["name"].strip("[]").strip()
+        elif match["symbol"]:
+            yield "symbol", match["symbol"]
+        elif match["other"]:
+            raise ExpressionError(INVALID_OPERATION)  # e.g. %, ^ or x
+
+
+class Program:
+    """
+    A compiled expression: instructions for a small stack machine.
+
+    `variables` are the names the expression reads, in order of first use.
+    Call it with keyword values for one result, or use evaluate_columns()
+    for arrays.
+    """
+
+    __slots__ = ("text", "code", "variables")
+
+    def __init__(self, text, code, variables):
+        self.text = text
+        self.code = code  # tuple of (opcode, argument)
+        self.variables = variables
+
+    def __repr__(self):
+        return f"Program({self.text!r})"
+
+    def __call__(self, **values):
+        """Result for one set of values; raises ZeroDivisionError with the calculator's message"""
+        stack = []
+        for op, arg in self.code:
+            if op == CONST:
+                stack.append(arg)
+            elif op == LOAD:
+                stack.append(float(values[self.variables[arg]]))
+            elif op == NEG:
+                stack[-1] = -stack[-1]
+            else:
+                right = stack.pop()
+                left = stack[-1]
+                if op == ADD:
+                    stack[-1] = left + right
+                elif op == SUB:
+                    stack[-1] = left - right
+                elif op == MUL:
+                    stack[-1] = left * right
+                elif right == 0:
+                    raise ZeroDivisionError(DIVISION_BY_ZERO)
+                else:
+                    stack[-1] = left / right
+        return stack[0]
+
+    def evaluate_columns(self, columns):
+        """
+        Run the program over columns (a dict of arrays or a DataFrame).
+
+        Returns (values, errors): float64 results, NaN where a row failed, and
+        uint8 error codes (OK, ZERO_DIVISION, or MISSING for a row with an
+        empty / NaN input; see ERROR_MESSAGES). Every
+        instruction is one NumPy operation over all rows; intermediate results
+        are updated in place, so a long formula does not allocate a new
+        array per step.
+        """
+        loaded = [np.atleast_1d(np.asarray(columns[name], dtype=np.float64)) for name in self.variables]
+        if loaded:
+            shape = np.broadcast_shapes(*(column.shape for column in loaded))
+        elif hasattr(columns, "columns"):  # a constant over a DataFrame: one value per row
+            shape = (len(columns),)
+        else:  # a constant: one value per row of the first column
+            shape = np.atleast_1d(columns[next(iter(columns))]).shape if len(columns) else (1,)
+        failed = np.zeros(shape, dtype=bool)
+        missing = np.zeros(shape, dtype=bool)
+        for column in loaded:
+            missing |= np.isnan(column)
+        stack = []  # [value, owned]; owned arrays are full-size temporaries that may be overwritten
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for op, arg in self.code:
+                if op == CONST:
+                    stack.append([arg, False])
+                elif op == LOAD:
+                    stack.append([loaded[arg], False])
+                elif op == NEG:
+                    value, owned = stack[-1]
+                    value = np.negative(value, out=value if owned else None)
+                    stack[-1] = [value, np.shape(value) == shape]
+                else:
+                    right, right_owned = stack.pop()
+                    left, left_owned = stack[-1]
+                    if op == DIV:
+                        failed |= np.equal(right, 0)
+                    ufunc = (np.add, np.subtract, np.multiply, np.divide)[op - ADD]
+                    out = left if left_owned else right if right_owned else None
+                    value = ufunc(left, right, out=out)
+                    stack[-1] = [value, np.shape(value) == shape]
+        values = np.broadcast_to(np.asarray(stack[0][0], dtype=np.float64), shape).copy()
+        values[failed | missing] = np.nan
+        errors = failed.astype(np.uint8) * ZERO_DIVISION
+        errors[missing] = MISSING
+        return values, errors
+
+
+def _parse(text):
+    """Instructions and variable names for an expression (shunting-yard to postfix)"""
+    code = []
+    variables = []
+    pending = []  # operators waiting for their right operand; "(" marks a group
+    expect_operand = True
+    for kind, value in _tokens(text):
+        if expect_operand:
+            if kind == "number":
+                code.append((CONST, value))
+            elif kind == "name":
+                if value not in variables:
+                    variables.append(value)
+                code.append((LOAD, variables.index(value)))
+            elif value == "(":
+                pending.append("(")
+                continue
+            elif value in "+-":
+                if value == "-":
+                    pending.append(NEG)
+                continue
+            else:
+                raise ExpressionError(f"Error: Invalid expression {text.strip()!r}")
+            expect_operand = False
+            while pending and pending[-1] == NEG:
+                _emit(code, pending.pop())
+        elif kind == "symbol" and value == ")":
+            while pending and pending[-1] != "(":
+                _emit(code, pending.pop())
+            if not pending:
+                raise ExpressionError(f"Error: Unbalanced parentheses in {text.strip()!r}")
+            pending.pop()
+            while pending and pending[-1] == NEG:
+                _emit(code, pending.pop())
+        elif kind == "symbol" and value in OPERATORS:
+            op = OPERATORS[value]
+            while pending and pending[-1] not in ("(", NEG) and PRECEDENCE[pending[-1]] >= PRECEDENCE[op]:
+                _emit(code, pending.pop())
+            pending.append(op)
+            expect_operand = True
+        elif kind == "symbol" and value == "(":
+            raise ExpressionError(f"Error: Invalid expression {text.strip()!r}")
+        else:
+            raise ExpressionError(INVALID_OPERATION)  # a number or name where the operator should be
+    if expect_operand:
+        raise ExpressionError(f"Error: Invalid expression {text.strip()!r}")
+    while pending:
+        op = pending.pop()
+        if op == "(":
+            raise ExpressionError(f"Error: Unbalanced parentheses in {text.strip()!r}")
+        _emit(code, op)
+    return tuple(code), tuple(variables)
+
+
+def _emit(code, op):
+    """
+    Append the instruction for `op`, folding it into the constant(s) before it.
+
+    Constant sub-expressions such as "1 / 1000" are computed once here instead
+    of for every row. Division by a constant zero is left for evaluation, so it
+    is reported like any other division by zero.
+    """
+    if op == NEG:
+        if code[-1][0] == CONST:
+            code[-1] = (CONST, -code[-1][1])
+        else:
+            code.append((NEG, None))
+        return
+    if len(code) >= 2 and code[-1][0] == CONST and code[-2][0] == CONST and not (op == DIV and code[-1][1] == 0):
+        right = code.pop()[1]
+        left = code[-1][1]
+        if op == ADD:
+            code[-1] = (CONST, left + right)
+        elif op == SUB:
+            code[-1] = (CONST, left - right)
+        elif op == MUL:
+            code[-1] = (CONST, left * right)
+        else:
+            code[-1] = (CONST, left / right)
+        return
+    code.append((op, None))
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_expression(text):
+    """Program for an expression, parsed once per distinct text"""
+    code, variables = _parse(text)
+    return Program(text, code, variables)
+
+
+def evaluate(text, **values):
+    """Result of one expression (raises ExpressionError / ZeroDivisionError)"""
+    return compile_expression(text)(**values)
+
+
+def evaluate_lines(lines, values=None):
+    """
+    Evaluate a stream of expressions, one per line (blank lines are skipped).
+
+    Yields (expression, result, error) for each; error is the calculator's
+    message and result None when the line failed.
+    """
+    values = values or {}
+    for line in lines:
+        text = line.strip()
+        if not text:
+            continue
+        try:
+            program = compile_expression(text)
+            missing = [name for name in program.variables if name not in values]
+            if missing:
+                raise ExpressionError(f"Error: Unknown name(s) {', '.join(missing)}")
+            yield text, program(**values), None
+        except (ExpressionError, ZeroDivisionError) as error:
+            yield text, None, str(error)
+
+
+def calculate_rows(num1, num2, operations):
+    """
+    The calculator for whole columns: row i is num1[i] <operations[i]> num2[i].
+
+    Returns (values, errors) like Program.evaluate_columns, with INVALID for
+    rows whose operation is not one of + - * /.
+    """
+    num1, num2, operations = np.broadcast_arrays(
+        np.asarray(num1, dtype=np.float64), np.asarray(num2, dtype=np.float64), np.asarray(operations, dtype=str)
+    )
+    operations = np.char.strip(operations)
+    values = np.full(operations.shape, np.nan)
+    errors = np.full(values.shape, INVALID, dtype=np.uint8)
+    for symbol, ufunc in (("+", np.add), ("-", np.subtract), ("*", np.multiply), ("/", np.divide)):
+        rows = operations == symbol
+        if symbol == "/":
+            errors[rows & (num2 == 0)] = ZERO_DIVISION
+            rows &= num2 != 0
+        errors[rows] = OK
+        with np.errstate(all="ignore"):
+            np.copyto(values, ufunc(num1, num2), where=rows)
+    return values, errors
@@ -0,0 +1,154 @@
+#FleetStatus: live fleet-wide status, kept up to date from robot events
+#Attach it as the event sink (alone, or next to a log with TeeSink) and every
+#start / stop / task / weld / paint updates a few counters. snapshot() then
+#answers "how many robots of each type are working, how much work was done,
+#who are the busiest robots" without visiting every robot.
+#----------------------------------------------------------------------------------
+
+from robot_events import NullSink
+
+
+class _Bucket:
+    """All robots with the same tasks_completed, in a list of buckets sorted by count"""
+
+    __slots__ = ("count", "robots", "prev", "next")
+
+    def __init__(self, count, prev, next):
+        self.count = count
+        self.robots = {}  # used as an ordered set of _Records
+        self.prev = prev
+        self.next = next
+
+
+class _Record:
+    __slots__ = (
+        "name", "robot_type", "is_working", "tasks_completed", "welds_completed", "surfaces_painted", "bucket"
+    )
+
+
+class FleetStatus(NullSink):
+    """
+    Event sink that keeps aggregate fleet status incrementally.
+
+    Every update is O(1): per-type working / idle counts and the totals are
+    plain counters, and robots are grouped into buckets by tasks_completed
+    that are kept in a sorted linked list (a task moves a robot to the next
+    bucket). snapshot(n) costs O(number of robot types + n).
+
+    Robots are picked up when they are created (or on their first event, for
+    robots created before the sink was attached); track() adds existing
+    robots in bulk. Robots are told apart by their uid, not by name, so two
+    robots with the same name are counted separately; only uids are kept, so
+    tracking a robot does not keep it alive.
+    """
+
+    def __init__(self):
+        self.records = {}  # robot uid -> _Record
+        self.by_type = {}  # robot_type -> [idle, working]
+        self.totals = {"tasks_completed": 0, "welds_completed": 0, "surfaces_painted": 0}
+        self.working = 0
+        self._lowest = _Bucket(-1, None, None)  # sentinel below every real bucket
+        self._highest = self._lowest
+
+    def track(self, robots):
+        for robot in robots:
+            if robot.uid not in self.records:
+                self._add(robot)
+        return self
+
+    def _add(self, robot):
+        record = self.records[robot.uid] = _Record()
+        record.name = robot.name
+        record.robot_type = robot.robot_type
+        record.is_working = bool(robot.is_working)
+        record.tasks_completed = 0
+        record.welds_completed = getattr(robot, "welds_completed", 0)
+        record.surfaces_painted = getattr(robot, "surfaces_painted", 0)
+        record.bucket = None
+        self.by_type.setdefault(record.robot_type, [0, 0])[record.is_working] += 1
+        self.working += record.is_working
+        self.totals["welds_completed"] += record.welds_completed
+        self.totals["surfaces_painted"] += record.surfaces_painted
+        self._set_tasks(record, robot.tasks_completed)
+        return record
+
+    def _set_tasks(self, record, count):
+        """Move a robot to the bucket for `count` tasks"""
+        self.totals["tasks_completed"] += count - record.tasks_completed
+        record.tasks_completed = count
+        # Start from the robot's bucket (a task only moves it one bucket up)
+        bucket = record.bucket or self._lowest
+        if record.bucket is not None:
+            del bucket.robots[record]
+        while bucket.next is not None and bucket.next.count <= count:
+            bucket = bucket.next
+        while bucket.count > count:
+            bucket = bucket.prev
+        if bucket.count != count:
+            new = _Bucket(count, bucket, bucket.next)
+            if bucket.next is not None:
+                bucket.next.prev = new
+            else:
+                self._highest = new
+            bucket.next = new
+            bucket = new
+        bucket.robots[record] = None
+        old = record.bucket
+        record.bucket = bucket
+        if old is not None and not old.robots and old is not bucket:
+            self._unlink(old)
+
+    def _unlink(self, bucket):
+        bucket.prev.next = bucket.next
+        if bucket.next is not None:
+            bucket.next.prev = bucket.prev
+        else:
+            self._highest = bucket.prev
+
+    def emit(self, robot, kind, value=0, detail=None):
+        record = self.records.get(robot.uid)
+        if record is None:
+            self._add(robot)  # read from the robot, which already includes this event
+            return
+        if kind in ("start", "stop"):
+            working = kind == "start"
+            if record.is_working != working:
+                record.is_working = working
+                counts = self.by_type[record.robot_type]
+                counts[working] += 1
+                counts[not working] -= 1
+                self.working += 1 if working else -1
+        elif kind == "task":
+            self._set_tasks(record, value)
+        elif kind == "weld":
+            self.totals["welds_completed"] += value - record.welds_completed
+            record.welds_completed = value
+        elif kind == "paint":
+            self.totals["surfaces_painted"] += value - record.surfaces_painted
+            record.surfaces_painted = value
+
+    def busiest(self, n=5):
+        """[(name, tasks_completed)] of the n robots with the most tasks"""
+        top = []
+        bucket = self._highest
+        while bucket is not self._lowest and len(top) < n:
+            for record in bucket.robots:
+                top.append((record.name, bucket.count))
+                if len(top) == n:
+                    break
+            bucket = bucket.prev
+        return top
+
+    def snapshot(self, n=5):
+        """Machine-readable fleet status"""
+        return {
+            "robots": len(self.records),
+            "working": self.working,
+            "idle": len(self.records) - self.working,
+            "by_type": {
+                robot_type: {"working": working, "idle": idle}
+                for robot_type, (idle, working) in self.by_type.items()
+            },
+            **self.totals,
+            "busiest": self.busiest(n),
+        }
@@ -7,36 +7,61 @@
 #Polymorphism: Each robot type has its own specialized behavior
 #----------------------------------------------------------------------------------
 
+import threading
+
+from robot_events import PrintSink
+
+_uid_lock = threading.Lock()
+_next_uid = 0
+
+
+def reserve_uids(count):
+    """`count` new robot uids (a range): unique in this process and never reused, unlike id()"""
+    global _next_uid
+    with _uid_lock:
+        start = _next_uid
+        _next_uid += count
+    return range(start, start + count)
 
 
 class IndustrialRobot:
+
+    # __slots__ instead of a per-instance __dict__: much smaller robots for big fleets
+    # (robot_fleet.RobotFleet stores very large fleets as arrays instead)
+    __slots__ = ("uid", "name", "robot_type", "max_weight", "is_working", "tasks_completed")
+
+    # Where state changes go (see robot_events.py); PrintSink prints the usual messages.
+    # Swap it for every robot at once, e.g. IndustrialRobot.events = EventLog("robots.jsonl")
+    events = PrintSink()
     
     def __init__(self, name, robot_type, max_weight):
         # Constructor - initializes the robot with unique values
+        self.uid = reserve_uids(1)[0]  # how event sinks tell robots apart (names may repeat)
         self.name = name          # Robot's name/ID
         self.robot_type = robot_type  # Type of robot (welding, painting, etc.)
         self.max_weight = max_weight  # Maximum weight it can lift (kg)
         self.is_working = False   # Is the robot currently working?
         self.tasks_completed = 0  # Count of completed tasks
+        self.events.emit(self, "register")  # lets fleet-wide sinks count the new robot
     
     def start_work(self):
         if not self.is_working:
             self.is_working = True
-            print(f"{self.name} is now working, keep safe distance!")
+            self.events.emit(self, "start")
         else:
-            print(f"{self.name} is already working!")
+            self.events.emit(self, "already_working")
     
     def stop_work(self):
         if self.is_working:
             self.is_working = False
-            print(f"{self.name} has stopped working.")
+            self.events.emit(self, "stop")
         else:
-            print(f"{self.name} is not working right now.")
+            self.events.emit(self, "not_working")
     
     def perform_task(self, task_name):
         if self.is_working:
-            print(f"{self.name} is performing: {task_name}")
             self.tasks_completed += 1
+            self.events.emit(self, "task", self.tasks_completed, task_name)
             return f"Task '{task_name}' completed successfully!"
         else:
             return "Robot is not working. Start work first!"
@@ -53,6 +78,8 @@ class IndustrialRobot:
 
 # Create a specialized WeldingRobot class that inherits from IndustrialRobot
 class WeldingRobot(IndustrialRobot):
+
+    __slots__ = ("welding_type", "welds_completed")
     
     def __init__(self, name, max_weight, welding_type):
         # Call the parent class constructor
@@ -65,6 +92,7 @@ class WeldingRobot(IndustrialRobot):
         if self.is_working:
             result = self.perform_task(f"Welding {material} with {self.welding_type}")
             self.welds_completed += 1
+            self.events.emit(self, "weld", self.welds_completed, material)
             return result + f" Total welds: {self.welds_completed}"
         else:
             return "Start work first!"
@@ -77,6 +105,8 @@ class WeldingRobot(IndustrialRobot):
 
 # Create a specialized PaintingRobot class
 class PaintingRobot(IndustrialRobot):
+
+    __slots__ = ("color", "surfaces_painted")
     
     def __init__(self, name, max_weight, color):
         super().__init__(name, "Painting Robot", max_weight)
@@ -88,56 +118,59 @@ class PaintingRobot(IndustrialRobot):
         if self.is_working:
             result = self.perform_task(f"Painting {surface} with {self.color} paint")
             self.surfaces_painted += 1
+            self.events.emit(self, "paint", self.surfaces_painted, surface)
             return result + f" 🎨"
         else:
             return "Start work first!"
     
     def change_color(self, new_color):
         self.color = new_color
+        self.events.emit(self, "color", detail=new_color)
         return f"Paint color changed to {new_color}!"
 
-# Robots tests.
-print("=== ROBOT FACTORY DEMO ===\n")
-
-# Create a basic industrial robot
-basic_robot = IndustrialRobot("Robo-001", "General Purpose", 50)
-print(basic_robot.get_status())
-
-basic_robot.start_work()
-print(basic_robot.perform_task("Moving parts"))
-print(basic_robot.lift_object(30))
-print(basic_robot.lift_object(60))  # Too heavy!
-print()
-
-# Create a welding robot (inheritance example)
-welder = WeldingRobot("WeldMaster-2000", 40, "MIG Welding")
-print(welder.get_status())
-
-welder.start_work()
-print(welder.perform_weld("steel"))
-print(welder.perform_weld("aluminum"))
-print(welder.get_status())
-print()
-
-# Create a painting robot (inheritance example)
-painter = PaintingRobot("PaintPro-3000", 25, "blue")
-print(painter.get_status())
-
-painter.start_work()
-print(painter.paint_surface("car door"))
-print(painter.change_color("red"))
-print(painter.paint_surface("bonnet"))
-print(painter.get_status())
-print()
-
-# Show that all robots can use the same basic methods (polymorphism)
-robots = [basic_robot, welder, painter]
-
-print("=== ALL ROBOTS STATUS ===")
-for robot in robots:
-    # Each robot has its own version of get_status()
-    print(robot.get_status())
-    # All robots can perform tasks
-    if robot.is_working:
-        print(robot.perform_task("cleaning up"))
+if __name__ == "__main__":
+    # Robots tests.
+    print("=== ROBOT FACTORY DEMO ===\n")
+
+    # Create a basic industrial robot
+    basic_robot = IndustrialRobot("Robo-001", "General Purpose", 50)
+    print(basic_robot.get_status())
+
+    basic_robot.start_work()
+    print(basic_robot.perform_task("Moving parts"))
+    print(basic_robot.lift_object(30))
+    print(basic_robot.lift_object(60))  # Too heavy!
     print()
+
+    # Create a welding robot (inheritance example)
+    welder = WeldingRobot("WeldMaster-2000", 40, "MIG Welding")
+    print(welder.get_status())
+
+    welder.start_work()
+    print(welder.perform_weld("steel"))
+    print(welder.perform_weld("aluminum"))
+    print(welder.get_status())
+    print()
+
+    # Create a painting robot (inheritance example)
+    painter = PaintingRobot("PaintPro-3000", 25, "blue")
+    print(painter.get_status())
+
+    painter.start_work()
+    print(painter.paint_surface("car door"))
+    print(painter.change_color("red"))
+    print(painter.paint_surface("bonnet"))
+    print(painter.get_status())
+    print()
+
+    # Show that all robots can use the same basic methods (polymorphism)
+    robots = [basic_robot, welder, painter]
+
+    print("=== ALL ROBOTS STATUS ===")
+    for robot in robots:
+        # Each robot has its own version of get_status()
+        print(robot.get_status())
+        # All robots can perform tasks
+        if robot.is_working:
+            print(robot.perform_task("cleaning up"))
+        print()
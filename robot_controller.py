@@ -0,0 +1,248 @@
+#RobotController: drives many robots at once from one asyncio event loop
+#Each robot has its own task queue and a worker coroutine that runs the tasks
+#one after another. Tasks take time (asyncio.sleep stands in for the real work),
+#so thousands of robots can be busy at the same time in a single thread.
+#----------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+from industrial_robot import IndustrialRobot, PaintingRobot, WeldingRobot
+from robot_events import EventLog, NullSink
+
+# Job kind -> robot method that runs it
+JOB_METHODS = {"task": "perform_task", "weld": "perform_weld", "paint": "paint_surface"}
+
+_NO_ROBOT = np.iinfo(np.int64).max  # score of robots that cannot take a job
+
+
+class Job:
+    """One task for the controller; `future` gets the robot's result message"""
+
+    __slots__ = ("name", "kind", "weight", "duration", "future", "robot_id", "submitted", "started")
+
+    def __init__(self, name, kind="task", weight=0, duration=None):
+        if kind not in JOB_METHODS:
+            raise ValueError(f"Unknown job kind {kind!r}, use one of {tuple(JOB_METHODS)}")
+        self.name = name
+        self.kind = kind
+        self.weight = weight
+        self.duration = duration  # seconds; None uses the controller's task_duration
+        self.future = None
+        self.robot_id = None
+        self.submitted = None
+        self.started = None
+
+
+class RobotController:
+    """
+    Assigns jobs to robots and runs them concurrently.
+
+    Assignment is load aware: among the robots that can do the job (right
+    kind, max_weight big enough, queue not full) it picks the one with the
+    fewest queued + running jobs, then the fewest tasks_completed. So an idle
+    robot that has done the least work gets the job first.
+
+    Backpressure: every robot queue holds at most `queue_size` jobs. When all
+    suitable robots are full, submit() waits until one of them frees a slot.
+
+    Cancellation: cancel the future returned by submit(). A queued job is
+    skipped; a running job finishes its current step but is not counted.
+    A job that raises (in the robot method or in task_duration) fails its
+    future with that exception; the robot's worker goes on with the next job.
+
+    Latency percentiles cover the last `latency_window` completed jobs, so a
+    long-running controller keeps a fixed amount of timing data; the maxima
+    cover every job.
+    """
+
+    def __init__(self, robots, queue_size=4, task_duration=0.01, latency_window=100_000):
+        self.robots = list(robots)
+        self.queue_size = queue_size
+        self.task_duration = task_duration  # seconds, or a function job -> seconds
+        self.max_weight = np.array([robot.max_weight for robot in self.robots], dtype=np.float64)
+        self.load = np.zeros(len(self.robots), dtype=np.int64)  # queued + running jobs
+        self.completed = np.array([robot.tasks_completed for robot in self.robots], dtype=np.int64)
+        self.can_do = {
+            kind: np.array([hasattr(robot, method) for robot in self.robots])
+            for kind, method in JOB_METHODS.items()
+        }
+        self.waiting = 0  # submit() calls blocked by backpressure
+        self.queues = []
+        self.workers = []
+        self.slot_freed = None
+        self.cancelling = False
+        self.started = None
+        self.counts = {"submitted": 0, "completed": 0, "cancelled": 0, "failed": 0, "waited": 0}
+        self.latencies = deque(maxlen=latency_window)  # submit -> done, seconds
+        self.waits = deque(maxlen=latency_window)  # submit -> start, seconds
+        self.max_seconds = {"latency": 0.0, "queue_wait": 0.0}
+
+    async def start(self):
+        self.started = time.perf_counter()
+        self.slot_freed = asyncio.Condition()
+        for robot_id, robot in enumerate(self.robots):
+            robot.start_work()
+            self.queues.append(asyncio.Queue(self.queue_size))
+            self.workers.append(asyncio.create_task(self._worker(robot_id)))
+        return self
+
+    def _pick(self, job):
+        """Robot id for the job, or None when every suitable robot's queue is full"""
+        suitable = self.can_do[job.kind] & (self.max_weight >= job.weight)  # one vectorised op, not cached
+        if not suitable.any():
+            raise ValueError(f"No robot can do {job.kind} {job.name!r} ({job.weight}kg)")
+        # lowest load first, then lowest tasks_completed; full or unsuitable robots never win
+        score = (self.load << 32) + self.completed
+        score[~suitable | (self.load >= self.queue_size)] = _NO_ROBOT
+        robot_id = int(score.argmin())
+        return None if score[robot_id] == _NO_ROBOT else robot_id
+
+    async def submit(self, job):
+        """Queue a job on the best robot (waiting for room if needed); returns its future"""
+        job.submitted = time.perf_counter()
+        job.future = asyncio.get_running_loop().create_future()
+        robot_id = self._pick(job)
+        if robot_id is None:
+            self.counts["waited"] += 1
+            self.waiting += 1
+            try:
+                async with self.slot_freed:
+                    while (robot_id := self._pick(job)) is None:
+                        await self.slot_freed.wait()
+            finally:
+                self.waiting -= 1
+        job.robot_id = robot_id
+        self.load[robot_id] += 1
+        self.counts["submitted"] += 1
+        self.queues[robot_id].put_nowait(job)  # never blocks: load < queue_size
+        return job.future
+
+    async def _worker(self, robot_id):
+        robot = self.robots[robot_id]
+        queue = self.queues[robot_id]
+        while True:
+            job = await queue.get()
+            try:
+                if self.cancelling:
+                    job.future.cancel()
+                if job.future.cancelled():
+                    self.counts["cancelled"] += 1
+                    continue
+                job.started = time.perf_counter()
+                duration = job.duration
+                if duration is None:
+                    duration = self.task_duration(job) if callable(self.task_duration) else self.task_duration
+                await asyncio.sleep(duration)
+                if job.future.cancelled():
+                    self.counts["cancelled"] += 1
+                    continue
+                result = getattr(robot, JOB_METHODS[job.kind])(job.name)
+                self.completed[robot_id] = robot.tasks_completed
+                self.counts["completed"] += 1
+                latency = time.perf_counter() - job.submitted
+                wait = job.started - job.submitted
+                self.latencies.append(latency)
+                self.waits.append(wait)
+                self.max_seconds["latency"] = max(self.max_seconds["latency"], latency)
+                self.max_seconds["queue_wait"] = max(self.max_seconds["queue_wait"], wait)
+                job.future.set_result(result)
+            except Exception as error:
+                # A failing job (robot method or task_duration) fails its future,
+                # the worker carries on with the next job
+                self.counts["failed"] += 1
+                if not job.future.done():
+                    job.future.set_exception(error)
+            finally:
+                self.load[robot_id] -= 1
+                queue.task_done()
+                if self.waiting:
+                    async with self.slot_freed:
+                        self.slot_freed.notify_all()  # waiters re-check; one may need another robot
+
+    async def join(self):
+        """Wait until every queued job has run (or been skipped)"""
+        for queue in self.queues:
+            await queue.join()
+
+    async def shutdown(self, cancel_pending=False):
+        """Stop the workers; with cancel_pending, queued jobs are cancelled instead of run"""
+        self.cancelling = cancel_pending
+        await self.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        for robot in self.robots:
+            robot.stop_work()
+
+    def stats(self):
+        """Counters, throughput (jobs/s) and latency percentiles (ms, over the latency window)"""
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        stats = dict(self.counts, elapsed_s=elapsed)
+        stats["throughput_per_s"] = self.counts["completed"] / elapsed if elapsed else 0.0
+        for name, values in (("latency", self.latencies), ("queue_wait", self.waits)):
+            if values:
+                p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+                stats[f"{name}_ms"] = {"p50": p50, "p95": p95, "p99": p99, "max": self.max_seconds[name] * 1000}
+        return stats
+
+
+def make_robots(count):
+    """A mixed fleet: a third each of general, welding and painting robots"""
+    robots = []
+    for i in range(count):
+        if i % 3 == 0:
+            robots.append(IndustrialRobot(f"Robo-{i}", "General Purpose", 50))
+        elif i % 3 == 1:
+            robots.append(WeldingRobot(f"Weld-{i}", 40, "MIG Welding"))
+        else:
+            robots.append(PaintingRobot(f"Paint-{i}", 25, "blue"))
+    return robots
+
+
+async def benchmark(robot_count, job_count, duration, queue_size):
+    controller = await RobotController(make_robots(robot_count), queue_size, duration).start()
+    rng = np.random.default_rng(0)
+    kinds = rng.choice(list(JOB_METHODS), job_count)
+    weights = rng.integers(0, 26, job_count)  # every kind of robot in make_robots can lift these
+    futures = [await controller.submit(Job(f"job-{i}", kind, weight)) for i, (kind, weight) in enumerate(zip(kinds, weights))]
+    await asyncio.gather(*futures)
+    stats = controller.stats()
+    await controller.shutdown()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive many robots concurrently from one event loop")
+    parser.add_argument("--robots", type=int, default=3000)
+    parser.add_argument("--jobs", type=int, default=60_000)
+    parser.add_argument("--duration", type=float, default=0.02, help="seconds per task")
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--event-log", help="record robot events here (.bin: binary, else JSON lines)")
+    args = parser.parse_args(argv)
+
+    # No per-task printing: events are dropped, or logged in the background
+    if args.event_log:
+        IndustrialRobot.events = EventLog(args.event_log, "binary" if args.event_log.endswith(".bin") else "jsonl")
+    else:
+        IndustrialRobot.events = NullSink()
+    try:
+        stats = asyncio.run(benchmark(args.robots, args.jobs, args.duration, args.queue_size))
+    finally:
+        IndustrialRobot.events.close()
+
+    serial = args.jobs * args.duration
+    print(f"=== {args.jobs:,} jobs on {args.robots:,} robots ({args.duration * 1000:g} ms each) ===")
+    print(f"Wall time:   {stats['elapsed_s']:.2f} s (one robot at a time would take {serial:,.0f} s)")
+    print(f"Throughput:  {stats['throughput_per_s']:,.0f} jobs/s")
+    print(f"Latency:     p50 {stats['latency_ms']['p50']:.1f} ms, p95 {stats['latency_ms']['p95']:.1f} ms, p99 {stats['latency_ms']['p99']:.1f} ms")
+    print(f"Queue wait:  p50 {stats['queue_wait_ms']['p50']:.1f} ms, p95 {stats['queue_wait_ms']['p95']:.1f} ms")
+    print(f"Backpressure waits: {stats['waited']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#Event sinks for the robot classes
+#Every state change of a robot (start, stop, task, weld, paint, color change)
+#is sent to IndustrialRobot.events instead of being printed directly:
+#  PrintSink  prints the classic messages (the default, used by the demo)
+#  NullSink   drops everything (benchmarks)
+#  TeeSink    passes every event on to several sinks
+#  EventLog   records typed events in a ring buffer and writes them to a
+#             JSON-lines or binary file from a background thread
+#replay() reads such a file back and rebuilds the status of every robot.
+#NumPy is only imported for binary logs, so creating a robot does not load it.
+#----------------------------------------------------------------------------------
+
+import functools
+import json
+import threading
+import time
+
+# Event kinds, stored by index in the log
+KINDS = ("register", "start", "already_working", "stop", "not_working", "task", "weld", "paint", "color")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# First bytes of every log file, so its format never has to be guessed
+JSONL_MAGIC = b'{"robot_event_log": "jsonl", "version": 1}\n'
+BINARY_MAGIC = b"ROBOTEV1"
+
+
+@functools.lru_cache(maxsize=None)
+def event_dtype():
+    """One binary log record; `value` is the counter after the event (tasks, welds or surfaces)"""
+    import numpy as np
+
+    return np.dtype([("time", "<f8"), ("robot", "<i4"), ("kind", "u1"), ("value", "<i8")])
+
+# The messages the robot classes used to print
+MESSAGES = {
+    "start": "{name} is now working, keep safe distance!",
+    "already_working": "{name} is already working!",
+    "stop": "{name} has stopped working.",
+    "not_working": "{name} is not working right now.",
+    "task": "{name} is performing: {detail}",
+}
+
+
+class NullSink:
+    """Discards every event"""
+
+    def emit(self, robot, kind, value=0, detail=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class PrintSink(NullSink):
+    """Prints the same lines the robot classes always printed"""
+
+    def emit(self, robot, kind, value=0, detail=None):
+        message = MESSAGES.get(kind)
+        if message is not None:
+            print(message.format(name=robot.name, detail=detail))
+
+
+class TeeSink(NullSink):
+    """Sends every event to each of `sinks` (e.g. an EventLog and a FleetStatus)"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def emit(self, robot, kind, value=0, detail=None):
+        for sink in self.sinks:
+            sink.emit(robot, kind, value, detail)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class EventLog(NullSink):
+    """
+    Ring buffer of robot events, flushed to a file in batches by a background thread.
+
+    emit() only writes one row into a preallocated buffer (no I/O, no string
+    formatting). When `batch` events are waiting, the flusher thread is woken
+    up and appends them to the file. If the buffer fills up faster than the
+    file is written, emit() waits, so no event is ever lost.
+
+    Robots are told apart by their uid, not by name (two robots may share a
+    name): each robot gets its own log id the first time it is seen. Only
+    uids are kept, so logging a robot does not keep it alive.
+
+    format="jsonl": one JSON object per event (robot ids, names and task
+                    details included), easy to read and analyse
+    format="binary": raw event_dtype() records, much smaller and faster; robot
+                    names and types are kept in `<path>.robots.json`
+    Both start with a magic header (JSONL_MAGIC / BINARY_MAGIC).
+    """
+
+    def __init__(self, path, format="jsonl", capacity=1 << 16, batch=4096):
+        if format not in ("jsonl", "binary"):
+            raise ValueError(f"Unknown event log format {format!r}, use 'jsonl' or 'binary'")
+        self.path = path
+        self.format = format
+        self.capacity = capacity
+        self.batch = batch
+        if format == "binary":
+            import numpy as np
+
+            self.records = np.zeros(capacity, dtype=event_dtype())
+        else:
+            self.records = [None] * capacity  # (time, robot id, kind code, value) tuples
+        self.details = [None] * capacity  # task names etc. (JSON-lines only)
+        self.robots = {}  # robot uid -> robot id in this log
+        self.robot_table = []  # robot id -> [name, robot_type]
+        self.head = 0  # events emitted
+        self.tail = 0  # events written to the file
+        self._lock = threading.Lock()
+        self._register_lock = threading.Lock()
+        self._space = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._closing = False
+        self._file = open(path, "wb")
+        self._file.write(JSONL_MAGIC if format == "jsonl" else BINARY_MAGIC)
+        self._thread = threading.Thread(target=self._run, name="robot-event-log", daemon=True)
+        self._thread.start()
+
+    def _register(self, robot):
+        """Give a robot seen for the first time an id and log a register event"""
+        with self._register_lock:
+            robot_id = self.robots.get(robot.uid)
+            if robot_id is None:
+                robot_id = len(self.robot_table)
+                self.robot_table.append([robot.name, robot.robot_type])
+                self._append(robot_id, KIND_CODES["register"], 0, robot.robot_type)
+                self.robots[robot.uid] = robot_id
+        return robot_id
+
+    def _append(self, robot_id, code, value, detail):
+        with self._lock:
+            while self.head - self.tail >= self.capacity:
+                self._wake.set()
+                self._space.wait()
+            slot = self.head % self.capacity
+            self.records[slot] = (time.time(), robot_id, code, value)
+            self.details[slot] = detail
+            self.head += 1
+            if self.head - self.tail >= self.batch:
+                self._wake.set()
+
+    def emit(self, robot, kind, value=0, detail=None):
+        robot_id = self.robots.get(robot.uid)
+        if robot_id is None:
+            robot_id = self._register(robot)
+        if kind == "register":
+            return  # logged once, by _register
+        self._append(robot_id, KIND_CODES[kind], value, detail)
+
+    def _write(self, start, stop):
+        """Write events [start, stop) (absolute positions) to the file"""
+        first, last = start % self.capacity, (stop - 1) % self.capacity + 1
+        slices = [slice(first, last)] if first < last else [slice(first, self.capacity), slice(0, last)]
+        for part in slices:
+            if self.format == "binary":
+                self._file.write(self.records[part].tobytes())
+                continue
+            lines = []
+            for (stamp, robot_id, code, value), detail in zip(self.records[part], self.details[part]):
+                event = {
+                    "time": stamp,
+                    "robot_id": robot_id,
+                    "robot": self.robot_table[robot_id][0],
+                    "kind": KINDS[code],
+                    "value": value,
+                }
+                if detail is not None:
+                    event["detail"] = detail
+                lines.append(json.dumps(event))
+            self._file.write(("\n".join(lines) + "\n").encode())
+        self._file.flush()
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=0.5)
+            self._wake.clear()
+            with self._lock:
+                start, stop = self.tail, self.head
+                closing = self._closing
+                robot_table = [list(row) for row in self.robot_table]
+            if stop > start:
+                self._write(start, stop)
+                with self._lock:
+                    self.tail = stop
+                    self._space.notify_all()
+                if self.format == "binary":
+                    with open(self.path + ".robots.json", "w") as f:
+                        json.dump(robot_table, f)
+            if closing:
+                return
+
+    def flush(self):
+        """Block until everything emitted so far is in the file"""
+        with self._lock:
+            target = self.head
+            while self.tail < target:
+                self._wake.set()
+                self._space.wait(timeout=0.1)
+
+    def close(self):
+        with self._lock:
+            self._closing = True
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+
+
+def read_events(path):
+    """Events of a log file as dicts (time, robot_id, robot, kind, value[, detail])"""
+    with open(path, "rb") as f:
+        magic = f.read(max(len(JSONL_MAGIC), len(BINARY_MAGIC)))
+    if magic.startswith(BINARY_MAGIC):
+        import numpy as np
+
+        with open(path + ".robots.json") as f:
+            robot_table = json.load(f)
+        records = np.fromfile(path, dtype=event_dtype(), offset=len(BINARY_MAGIC))
+        for stamp, robot_id, code, value in records.tolist():
+            event = {
+                "time": stamp,
+                "robot_id": robot_id,
+                "robot": robot_table[robot_id][0],
+                "kind": KINDS[code],
+                "value": value,
+            }
+            if KINDS[code] == "register":
+                event["detail"] = robot_table[robot_id][1]
+            yield event
+        return
+    if not magic.startswith(JSONL_MAGIC):
+        raise ValueError(f"{path} is not a robot event log")
+    with open(path) as f:
+        f.readline()  # the magic header
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(path):
+    """Rebuild {robot id: status} from an event log (the status includes the robot's name)"""
+    status = {}
+    for event in read_events(path):
+        kind = event["kind"]
+        if kind == "register":
+            status[event["robot_id"]] = {
+                "name": event["robot"],
+                "robot_type": event.get("detail"),
+                "is_working": False,
+                "tasks_completed": 0,
+                "welds_completed": 0,
+                "surfaces_painted": 0,
+            }
+            continue
+        robot = status[event["robot_id"]]
+        if kind == "start":
+            robot["is_working"] = True
+        elif kind == "stop":
+            robot["is_working"] = False
+        elif kind == "task":
+            robot["tasks_completed"] = event["value"]
+        elif kind == "weld":
+            robot["welds_completed"] = event["value"]
+        elif kind == "paint":
+            robot["surfaces_painted"] = event["value"]
+    return status
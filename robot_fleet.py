@@ -0,0 +1,408 @@
+#RobotFleet: a whole fleet of robots stored column by column (struct of arrays)
+#Each attribute is one NumPy array indexed by robot id, instead of one Python
+#object per robot. fleet[i] returns a lightweight view that behaves like an
+#IndustrialRobot / WeldingRobot / PaintingRobot (same methods and attributes).
+#----------------------------------------------------------------------------------
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from industrial_robot import IndustrialRobot, PaintingRobot, WeldingRobot, reserve_uids
+from robot_events import NullSink
+
+# Robot kinds (which class a view is)
+INDUSTRIAL, WELDING, PAINTING = 0, 1, 2
+
+# Task kinds for RobotFleet.dispatch (perform_task, perform_weld, paint_surface, lift_object)
+TASK, WELD, PAINT, LIFT = 0, 1, 2, 3
+
+# Dispatch result codes, one per event
+OK, NOT_WORKING, TOO_HEAVY, WRONG_ROBOT = 0, 1, 2, 3
+STATUS_NAMES = ("ok", "not working", "too heavy", "wrong robot")
+
+# One row per dispatched event
+DISPATCH_RESULT = np.dtype([("robot_id", np.int64), ("kind", np.int8), ("status", np.int8)])
+
+
+class _Labels:
+    """Interns repeated strings (robot types, welding types, colors) as small integer codes"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+
+def _number(value):
+    """NumPy scalar -> plain Python number (whole numbers as int, so messages print '50kg')"""
+    value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class RobotFleet:
+    """
+    Struct-of-arrays storage for hundreds of thousands of robots.
+
+    Per robot this costs a few bytes per column plus the name string, against
+    a full Python object per robot. Arrays grow by doubling, like a list.
+    """
+
+    # column -> dtype
+    COLUMNS = {
+        "uid": np.int64,  # see industrial_robot.reserve_uids
+        "kind": np.int8,
+        "robot_type": np.int16,  # code into self.robot_types
+        "max_weight": np.float64,
+        "is_working": np.bool_,
+        "tasks_completed": np.int64,
+        "welding_type": np.int16,  # code into self.welding_types (welding robots)
+        "welds_completed": np.int64,
+        "color": np.int16,  # code into self.colors (painting robots)
+        "surfaces_painted": np.int64,
+    }
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.names = []
+        self.robot_types = _Labels()
+        self.welding_types = _Labels()
+        self.colors = _Labels()
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        # Aggregates kept up to date by every write, for status()
+        self._by_type = {}  # robot type code -> [idle, working]
+        self._totals = {"tasks_completed": 0, "welds_completed": 0, "surfaces_painted": 0}
+        self._working = 0
+        self._busiest = None  # cached top robots, cleared when tasks change
+
+    def __len__(self):
+        return self.size
+
+    def __getattr__(self, name):
+        # fleet.max_weight etc. -> the used part of that column (a view, no copy).
+        # The view is read-only: writes must go through _set, which keeps the
+        # status aggregates right
+        columns = self.__dict__.get("_columns")
+        if columns is not None and name in columns:
+            view = columns[name][: self.size]
+            view.flags.writeable = False
+            return view
+        raise AttributeError(name)
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self._columns["kind"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: self.size] = column[: self.size]
+            self._columns[name] = grown
+
+    def add_many(self, names, robot_type, max_weights, kind=INDUSTRIAL, welding_type=None, color=None):
+        """Add robots of one kind in bulk; returns their ids as a range"""
+        names = list(names)
+        count = len(names)
+        self._reserve(count)
+        start, stop = self.size, self.size + count
+        columns = self._columns
+        uids = reserve_uids(count)
+        columns["uid"][start:stop] = np.arange(uids.start, uids.stop)
+        columns["kind"][start:stop] = kind
+        type_code = self.robot_types.code(robot_type)
+        columns["robot_type"][start:stop] = type_code
+        self._by_type.setdefault(type_code, [0, 0])[0] += count
+        columns["max_weight"][start:stop] = max_weights
+        if welding_type is not None:
+            columns["welding_type"][start:stop] = self.welding_types.code(welding_type)
+        if color is not None:
+            columns["color"][start:stop] = self.colors.code(color)
+        self.names.extend(names)
+        self.size = stop
+        return range(start, stop)
+
+    def add(self, name, robot_type, max_weight):
+        return self[self.add_many([name], robot_type, max_weight)[0]]
+
+    def add_welding(self, name, max_weight, welding_type):
+        ids = self.add_many([name], "Welding Robot", max_weight, WELDING, welding_type=welding_type)
+        return self[ids[0]]
+
+    def add_painting(self, name, max_weight, color):
+        ids = self.add_many([name], "Painting Robot", max_weight, PAINTING, color=color)
+        return self[ids[0]]
+
+    @classmethod
+    def from_robots(cls, robots):
+        """Copy existing robot objects into a fleet"""
+        fleet = cls(capacity=max(len(robots), 1))
+        for robot in robots:
+            if isinstance(robot, WeldingRobot):
+                view = fleet.add_welding(robot.name, robot.max_weight, robot.welding_type)
+                view.welds_completed = robot.welds_completed
+            elif isinstance(robot, PaintingRobot):
+                view = fleet.add_painting(robot.name, robot.max_weight, robot.color)
+                view.surfaces_painted = robot.surfaces_painted
+            else:
+                view = fleet.add(robot.name, robot.robot_type, robot.max_weight)
+            view.is_working = robot.is_working
+            view.tasks_completed = robot.tasks_completed
+        return fleet
+
+    def __getitem__(self, robot_id):
+        if not -self.size <= robot_id < self.size:
+            raise IndexError(f"robot id {robot_id} out of range")
+        robot_id %= self.size
+        return _VIEWS[self._columns["kind"][robot_id]](self, robot_id)
+
+    def __iter__(self):
+        for robot_id in range(self.size):
+            yield self[robot_id]
+
+    def _ids(self, robot_ids):
+        robot_ids = np.asarray(robot_ids, dtype=np.int64)
+        if robot_ids.size and (robot_ids.min() < 0 or robot_ids.max() >= self.size):
+            raise IndexError("robot id out of range")
+        return robot_ids
+
+    def set_working(self, robot_ids, working=True):
+        """start_work / stop_work for many robots at once (no messages)"""
+        robot_ids = np.unique(self._ids(robot_ids))
+        column = self._columns["is_working"]
+        changed = robot_ids[column[robot_ids] != working]
+        column[changed] = working
+        codes, counts = np.unique(self._columns["robot_type"][changed], return_counts=True)
+        for code, count in zip(codes.tolist(), counts.tolist()):
+            by_type = self._by_type[code]
+            by_type[working] += count
+            by_type[not working] -= count
+        self._working += len(changed) if working else -len(changed)
+
+    def _set(self, column, robot_id, value):
+        """Write one robot's value (from a view), keeping the status aggregates right"""
+        columns = self._columns
+        old = columns[column][robot_id]
+        if column == "is_working" and bool(old) != bool(value):
+            by_type = self._by_type[columns["robot_type"][robot_id]]
+            by_type[bool(value)] += 1
+            by_type[not value] -= 1
+            self._working += 1 if value else -1
+        elif column == "robot_type" and old != value:
+            working = bool(columns["is_working"][robot_id])
+            self._by_type[old][working] -= 1
+            self._by_type.setdefault(value, [0, 0])[working] += 1
+        elif column in self._totals:
+            self._totals[column] += int(value - old)
+            if column == "tasks_completed":
+                self._busiest = None
+        columns[column][robot_id] = value
+
+    def dispatch(self, robot_ids, kinds, weights=None):
+        """
+        Apply a batch of task events and return one DISPATCH_RESULT row per event.
+
+        robot_ids, kinds (TASK / WELD / PAINT / LIFT) and weights (used by LIFT
+        only) are equal-length arrays. The rules are the ones of the robot
+        methods, checked for the whole batch at once:
+          - TASK, WELD and PAINT need a working robot; WELD only runs on welding
+            robots and PAINT on painting robots
+          - LIFT succeeds when weight <= max_weight and changes no state
+        Counters are bumped with one bincount per column instead of one
+        Python call (and print) per event. Nothing is printed.
+        """
+        robot_ids = self._ids(robot_ids)
+        kinds = np.broadcast_to(np.asarray(kinds, dtype=np.int8), robot_ids.shape)
+        columns = self._columns
+        robot_kind = columns["kind"][robot_ids]
+
+        status = np.where(columns["is_working"][robot_ids], OK, NOT_WORKING).astype(np.int8)
+        status[(kinds == WELD) & (robot_kind != WELDING)] = WRONG_ROBOT
+        status[(kinds == PAINT) & (robot_kind != PAINTING)] = WRONG_ROBOT
+
+        lifts = kinds == LIFT
+        if lifts.any():
+            if weights is None:
+                raise ValueError("LIFT events need weights")
+            weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), robot_ids.shape)
+            fits = weights[lifts] <= columns["max_weight"][robot_ids[lifts]]
+            status[lifts] = np.where(fits, OK, TOO_HEAVY)
+
+        done = (status == OK) & ~lifts
+        for column, kind in (("tasks_completed", None), ("welds_completed", WELD), ("surfaces_painted", PAINT)):
+            hits = robot_ids[done if kind is None else done & (kinds == kind)]
+            if hits.size:
+                columns[column][: self.size] += np.bincount(hits, minlength=self.size)
+                self._totals[column] += hits.size
+        if done.any():
+            self._busiest = None
+
+        result = np.empty(robot_ids.shape, dtype=DISPATCH_RESULT)
+        result["robot_id"] = robot_ids
+        result["kind"] = kinds
+        result["status"] = status
+        return result
+
+    def busiest(self, n=5):
+        """[(name, tasks_completed)] of the n robots with the most tasks"""
+        if self._busiest is None or len(self._busiest) < min(n, self.size):
+            # One argpartition over the counters, reused until tasks change again
+            tasks = self.tasks_completed
+            k = min(max(n, 16), self.size)
+            top = np.argpartition(tasks, self.size - k)[self.size - k:] if k else np.arange(0)
+            top = top[np.lexsort((top, -tasks[top]))]
+            self._busiest = [(self.names[i], int(tasks[i])) for i in top.tolist()]
+        return self._busiest[:n]
+
+    def status(self, n=5):
+        """
+        Same result shape as FleetStatus.snapshot().
+
+        The counts and totals are kept up to date by every write, so this does
+        not scan the fleet; only the busiest list is recomputed (one
+        argpartition) and only after tasks have changed.
+        """
+        return {
+            "robots": self.size,
+            "working": self._working,
+            "idle": self.size - self._working,
+            "by_type": {
+                self.robot_types.values[code]: {"working": working, "idle": idle}
+                for code, (idle, working) in self._by_type.items()
+            },
+            **self._totals,
+            "busiest": self.busiest(n),
+        }
+
+    def nbytes(self):
+        """Approximate memory used by the fleet (arrays, names and label tables)"""
+        arrays = sum(column.nbytes for column in self._columns.values())
+        names = sys.getsizeof(self.names) + sum(sys.getsizeof(name) for name in self.names)
+        return arrays + names
+
+
+def _column(name, labels=None):
+    """Property that reads / writes one robot's entry in a fleet column"""
+    if labels is None:
+        def get(self):
+            value = self.fleet._columns[name][self.index]
+            return bool(value) if value.dtype == np.bool_ else _number(value)
+
+        def set(self, value):
+            self.fleet._set(name, self.index, value)
+    else:
+        def get(self):
+            return getattr(self.fleet, labels).values[self.fleet._columns[name][self.index]]
+
+        def set(self, value):
+            self.fleet._set(name, self.index, getattr(self.fleet, labels).code(value))
+    return property(get, set)
+
+
+def _name_get(self):
+    return self.fleet.names[self.index]
+
+
+def _name_set(self, value):
+    self.fleet.names[self.index] = value
+
+
+def _uid_get(self):
+    return int(self.fleet._columns["uid"][self.index])
+
+
+class _FleetView:
+    """Attributes of one robot, read from and written to the fleet's arrays"""
+
+    __slots__ = ()
+
+    def __init__(self, fleet, index):
+        self.fleet = fleet
+        self.index = index
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.index} of fleet: {self.name}>"
+
+    name = property(_name_get, _name_set)
+    uid = property(_uid_get)  # the same for every view of one robot
+    robot_type = _column("robot_type", "robot_types")
+    max_weight = _column("max_weight")
+    is_working = _column("is_working")
+    tasks_completed = _column("tasks_completed")
+    welding_type = _column("welding_type", "welding_types")
+    welds_completed = _column("welds_completed")
+    color = _column("color", "colors")
+    surfaces_painted = _column("surfaces_painted")
+
+
+# The views inherit all behaviour from the robot classes; only storage differs
+class IndustrialRobotView(_FleetView, IndustrialRobot):
+    __slots__ = ("fleet", "index")
+
+
+class WeldingRobotView(_FleetView, WeldingRobot):
+    __slots__ = ("fleet", "index")
+
+
+class PaintingRobotView(_FleetView, PaintingRobot):
+    __slots__ = ("fleet", "index")
+
+
+_VIEWS = {INDUSTRIAL: IndustrialRobotView, WELDING: WeldingRobotView, PAINTING: PaintingRobotView}
+
+
+def _measure(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, size
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"=== MEMORY FOR {count:,} WELDING ROBOTS ===\n")
+
+    _, objects = _measure(lambda: [WeldingRobot(f"Weld-{i}", 40, "MIG Welding") for i in range(count)])
+    print(f"Robot objects (__slots__): {objects / 2**20:8.1f} MB")
+
+    def build_fleet():
+        fleet = RobotFleet(capacity=count)
+        fleet.add_many((f"Weld-{i}" for i in range(count)), "Welding Robot", 40, WELDING, welding_type="MIG Welding")
+        return fleet
+
+    fleet, arrays = _measure(build_fleet)
+    print(f"RobotFleet (arrays):       {arrays / 2**20:8.1f} MB\n")
+
+    # Views behave like the original robots
+    welder = fleet[0]
+    welder.start_work()
+    print(welder.perform_weld("steel"))
+    print(welder.get_status())
+
+    print(f"\n=== DISPATCHING {count * 5:,} WELD EVENTS ===\n")
+    fleet.set_working(np.arange(count))
+    robot_ids = np.random.default_rng(0).integers(0, count, count * 5)
+
+    start = time.perf_counter()
+    results = fleet.dispatch(robot_ids, WELD)
+    batch = time.perf_counter() - start
+    print(f"Batch dispatch:  {batch:.3f} s ({np.count_nonzero(results['status'] == OK):,} ok)")
+
+    sample = robot_ids[:count // 10]
+    start = time.perf_counter()
+    IndustrialRobot.events = NullSink()  # no printing, like dispatch
+    for robot_id in sample:
+        fleet[robot_id].perform_weld("steel")
+    per_call = (time.perf_counter() - start) / len(sample) * len(robot_ids)
+    print(f"One call each:   {per_call:.3f} s (estimated from {len(sample):,} calls)")
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from industrial_robot import IndustrialRobot  # noqa: E402
+from robot_controller import Job, RobotController  # noqa: E402
+from robot_events import NullSink  # noqa: E402
+
+
+class FaultyRobot(IndustrialRobot):
+    __slots__ = ()
+
+    def perform_task(self, task_name):
+        if task_name == "explode":
+            raise RuntimeError("gripper jammed")
+        return super().perform_task(task_name)
+
+
+@pytest.fixture(autouse=True)
+def quiet_robots(monkeypatch):
+    monkeypatch.setattr(IndustrialRobot, "events", NullSink())
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=10))
+
+
+def test_failing_job_fails_its_future_and_the_worker_keeps_going():
+    async def scenario():
+        controller = await RobotController([FaultyRobot("Robo-1", "General Purpose", 50)], task_duration=0).start()
+        failing = await controller.submit(Job("explode"))
+        after = await controller.submit(Job("move parts"))
+        with pytest.raises(RuntimeError, match="gripper jammed"):
+            await failing
+        result = await after
+        await controller.join()
+        stats = controller.stats()
+        await controller.shutdown()
+        return result, stats
+
+    result, stats = run(scenario())
+    assert result == "Task 'move parts' completed successfully!"
+    assert stats["failed"] == 1
+    assert stats["completed"] == 1
+
+
+def test_failing_task_duration_fails_the_job():
+    def duration(job):
+        if job.name == "bad":
+            raise ValueError("no duration")
+        return 0
+
+    async def scenario():
+        robots = [IndustrialRobot("Robo-1", "General Purpose", 50)]
+        controller = await RobotController(robots, task_duration=duration).start()
+        bad = await controller.submit(Job("bad"))
+        good = await controller.submit(Job("good"))
+        with pytest.raises(ValueError):
+            await bad
+        await good
+        await controller.shutdown()
+        return controller.counts
+
+    counts = run(scenario())
+    assert counts["failed"] == 1
+    assert counts["completed"] == 1
+
+
+def test_jobs_go_only_to_robots_that_can_lift_them():
+    async def scenario():
+        robots = [IndustrialRobot("Light", "General Purpose", 10), IndustrialRobot("Heavy", "General Purpose", 50)]
+        controller = await RobotController(robots, task_duration=0).start()
+        jobs = [Job(f"lift-{i}", weight=weight) for i, weight in enumerate([5.5, 20.25, 30.125, 9.0])]
+        for job in jobs:
+            await controller.submit(job)
+        with pytest.raises(ValueError, match="No robot can do"):
+            await controller.submit(Job("too heavy", weight=60))
+        await controller.join()
+        await controller.shutdown()
+        return [job.robot_id for job in jobs]
+
+    robot_ids = run(scenario())
+    assert robot_ids[1] == robot_ids[2] == 1
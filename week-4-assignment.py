@@ -1,4 +1,5 @@
 ##--------File Read & Write Challenge---------------##
+from text_pipeline import CHUNK_SIZE, process_file
 
 
 #create input.txt with sample content
@@ -15,22 +16,10 @@ with open('input.txt', 'w') as input_file:
 print("input.txt created successfully with 5 lines of text!")
 
 # Read, process, and write to output.txt
-    # Read the contents of input.txt
-with open('input.txt', 'r') as input_file:
-    content = input_file.read()
-    
-    # Count the number of words
-words = content.split()
-word_count = len(words)
-#alternative shorthand ---> word_count = len(content.split())
-    
-    # Convert all text to uppercase
-uppercaseText = content.upper()
-    
-    # Write processed text and word count to output.txt
-with open('output.txt', 'w') as output_file:
-    output_file.write(uppercaseText)
-    output_file.write(f"\n\nTOTAL WORD COUNT: {word_count}")
+    # The file is streamed in chunks (text_pipeline.py): each chunk is counted,
+    # uppercased and written before the next is read, so even multi-GB files
+    # never have to fit in memory. Words cut by a chunk boundary count once.
+word_count = process_file('input.txt', 'output.txt')
     
     # Print success message
 print(f"Success! output.txt has been created with {word_count} words\n\n")
@@ -42,8 +31,10 @@ filename = input("Enter filename to read: ")
 
 try:
     with open(filename, 'r') as file:
-        content = file.read()
-    print(f"\nFile content:\n{content}")
+        print("\nFile content:")
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), ''):  # printed piece by piece, not read whole
+            print(chunk, end="")
+    print()
     
 except FileNotFoundError:
     print(f"Error: File '{filename}' not found!")
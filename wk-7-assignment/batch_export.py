@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from data_analysis import CHARTS  # chart name -> (output file, draw function); plotting is imported lazily
+
+MANIFEST_NAME = ".chart_manifest.json"
+
+# Changing any of these files changes every chart's input hash
+CODE_FILES = ["data_analysis.py", "gdp_panel.py"]
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _code_hash():
+    here = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in CODE_FILES:
+        digest.update(_sha256_file(os.path.join(here, name)).encode())
+    return digest.hexdigest()
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _init_worker():
+    # Headless: pick the Agg backend before pyplot is imported anywhere
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def render_charts(csv_path, out_dir, charts):
+    """
+    Worker: render some charts for one CSV, which is loaded and cleaned once.
+
+    Returns (csv, out_dir, [(chart, seconds, created, error)]); a chart that
+    fails gets an error message instead of stopping the others.
+    """
+    _init_worker()
+    import matplotlib.pyplot as plt
+
+    from data_analysis import load_and_clean
+
+    plt.style.use("seaborn-v0_8")
+    try:
+        _, filled, df_filled = load_and_clean(csv_path)
+    except Exception as error:  # unreadable or malformed CSV: every chart of it fails
+        return csv_path, out_dir, [(chart, 0.0, False, _error_message(csv_path, error)) for chart in charts]
+
+    results = []
+    for chart in charts:
+        start = time.perf_counter()
+        filename, draw = CHARTS[chart]
+        try:
+            created = draw(filled, df_filled, os.path.join(out_dir, filename))
+        except Exception as error:
+            results.append((chart, time.perf_counter() - start, False, f"Error: Chart failed: {error}"))
+            continue
+        finally:
+            plt.close("all")
+        results.append((chart, time.perf_counter() - start, created, None))
+    return csv_path, out_dir, results
+
+
+def _error_message(csv_path, error):
+    if isinstance(error, FileNotFoundError):
+        return f"Error: File '{csv_path}' not found!"
+    if isinstance(error, PermissionError):
+        return f"Error: No permission to read '{csv_path}'!"
+    return f"Error: Could not process '{csv_path}': {error}"
+
+
+def plan_jobs(pairs, charts, force=False):
+    """
+    Work out which charts need rendering, grouped by (csv, out_dir).
+
+    A chart is skipped when its output exists and the manifest in out_dir
+    records the same input hash (CSV contents + chart name + chart code).
+    Returns (jobs, input hashes, number skipped, errors); a job is
+    (csv, out_dir, [charts]) and an error is (csv, out_dir, chart, message)
+    for each chart of a pair that could not be planned (missing CSV,
+    unwritable folder, ...).
+    """
+    code_hash = _code_hash()
+    jobs, hashes, skipped, errors = [], {}, 0, []
+    for csv_path, out_dir in pairs:
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            csv_hash = _sha256_file(csv_path)
+        except OSError as error:
+            message = _error_message(csv_path, error)
+            errors.extend((csv_path, out_dir, chart, message) for chart in charts)
+            continue
+        manifest = _load_manifest(out_dir)
+        todo = []
+        for chart in charts:
+            input_hash = hashlib.sha256(f"{csv_hash}:{chart}:{code_hash}".encode()).hexdigest()
+            hashes[(csv_path, out_dir, chart)] = input_hash
+            output = os.path.join(out_dir, CHARTS[chart][0])
+            if not force and manifest.get(chart) == input_hash and os.path.exists(output):
+                skipped += 1
+                continue
+            todo.append(chart)
+        if todo:
+            jobs.append((csv_path, out_dir, todo))
+    return jobs, hashes, skipped, errors
+
+
+def export_batch(pairs, charts=None, workers=None, force=False):
+    """
+    Render the charts for every (csv, out_dir) pair in a process pool; returns a summary dict.
+
+    Failures are reported per chart (or per pair) and do not stop the batch;
+    the manifests always record every chart that was rendered. A chart with
+    nothing to draw (no year columns) writes no file, so it is counted as
+    "empty", not as rendered, and is tried again on the next run.
+    """
+    charts = list(charts or CHARTS)
+    jobs, hashes, skipped, errors = plan_jobs(pairs, charts, force)
+    for csv_path, out_dir, chart, message in errors:
+        print(f"- {out_dir}: {chart}: {message}")
+
+    start = time.perf_counter()
+    rendered = empty = 0
+    done = {}  # out_dir -> {chart: input hash}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(render_charts, *job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    csv_path, out_dir, results = future.result()
+                except Exception as error:  # e.g. a worker process died
+                    csv_path, out_dir, job_charts = futures[future]
+                    results = [(chart, 0.0, False, _error_message(csv_path, error)) for chart in job_charts]
+                for chart, seconds, created, error in results:
+                    if error:
+                        errors.append((csv_path, out_dir, chart, error))
+                        print(f"- {out_dir}: {chart}: {error}")
+                        continue
+                    if not created:
+                        empty += 1
+                        print(f"- {out_dir}: {chart}: nothing to draw, no file written")
+                        continue
+                    rendered += 1
+                    done.setdefault(out_dir, {})[chart] = hashes[(csv_path, out_dir, chart)]
+                    print(f"- {out_dir}: {chart} ({seconds:.2f}s)")
+    finally:
+        # Only the parent writes manifests, so workers never race on them
+        for out_dir, entries in done.items():
+            manifest = _load_manifest(out_dir)
+            manifest.update(entries)
+            _save_manifest(out_dir, manifest)
+
+    return {
+        "rendered": rendered,
+        "skipped": skipped,
+        "empty": empty,
+        "failed": len(errors),
+        "errors": errors,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _read_pairs_file(path):
+    """One 'csv_path,out_dir' pair per line; blank lines and # comments are ignored"""
+    pairs = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                csv_path, out_dir = (part.strip() for part in line.split(",", 1))
+                pairs.append((csv_path, out_dir))
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless batch export of the GDP charts")
+    parser.add_argument(
+        "--pair", nargs=2, action="append", default=[], metavar=("CSV", "OUT_DIR"),
+        help="a GDP CSV and the folder for its charts (repeatable)",
+    )
+    parser.add_argument("--pairs-file", help="file with one 'csv,out_dir' per line")
+    parser.add_argument("--charts", nargs="+", choices=list(CHARTS), help="default: all")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="re-render even if inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    pairs = [tuple(pair) for pair in args.pair]
+    if args.pairs_file:
+        pairs += _read_pairs_file(args.pairs_file)
+    if not pairs:
+        parser.error("give at least one --pair or a --pairs-file")
+
+    summary = export_batch(pairs, args.charts, args.workers, args.force)
+    print(
+        f"\nRendered {summary['rendered']} charts, skipped {summary['skipped']} unchanged, "
+        f"{summary['empty']} with nothing to draw, {summary['failed']} failed in {summary['seconds']:.2f}s"
+    )
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
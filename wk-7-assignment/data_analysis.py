@@ -1,104 +1,82 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import sys
 
-os.system("cls" if os.name == "nt" else "clear")  # Clear terminal
+from gdp_panel import GDPPanel
 
 
-def main():
+def load_and_clean(csv_path="CountryGDP-2020-2025.csv"):
+    """Load a GDP CSV and fill its gaps; returns (raw df, filled GDPPanel, filled df)"""
+    df = pd.read_csv(csv_path)
 
-    # Load the dataset using pandas
-    df = pd.read_csv("CountryGDP-2020-2025.csv")
+    # The panel fills the year columns only (the Country column is left alone)
+    panel = GDPPanel.from_frame(df, id_column="Country")
+    filled = panel.fill("ffill")  # forward fill, then backward fill for leading gaps
+    df_filled = filled.to_frame(id_column="Country")
+    return df, filled, df_filled
 
-    # Display first ten rows
-    print("\nFirst 5 rows:")
-    print(df.head())
 
-    # Explore the dataset structure
-    print("\n=== Dataset Information ===")
-    print(f"Shape of the dataset: {df.shape}")
+def get_year_columns(df_filled):
+    # Get year columns (assuming they are in format YYYY)
+    return [col for col in df_filled.columns if col.isdigit() and len(col) == 4]
 
-    print("\n=== Data Types ===")
-    print(df.dtypes)
 
-    # Check for missing values
-    print("\n=== Missing Values ===")
-    missing_values = df.isnull().sum()
-    print(missing_values[missing_values > 0])  # Only show columns with missing values
+########################### Data Visualization  #########################################
+# matplotlib and seaborn are imported inside each chart function, so the
+# text-only report never loads the plotting stack.
 
-    # Handle missing values
-    # For years with missing GDP values, use forward fill (fill with previous year's value)
-    print("\n=== Handling Missing Values ===")
-    print("Filling missing values using forward fill...")
-    df_filled = df.ffill(axis=1)
 
-    # If there are still missing values (e.g., in the first column), use backward fill
-    df_filled = df_filled.bfill(axis=1)
+def line_chart(filled, df_filled, path, show=False):
+    """1. Line Chart: GDP Trends Over Time"""
+    import matplotlib.pyplot as plt
 
-    # Verify if any missing values remain
-    print("\nMissing values after filling:")
-    print(df_filled.isnull().sum().sum(), "missing values remaining")
+    year_columns = get_year_columns(df_filled)
+    if not year_columns:
+        return False
 
-    # Display the cleaned data
-    print("\n=== First 5 rows of cleaned data ===")
-    print(df_filled.head())
+    plt.figure(figsize=(12, 6))
 
-    # Basic statistics of the cleaned data
-    print("\n=== Basic Statistics ===")
-    print(df_filled.describe())
+    # Convert years to datetime for better x-axis
+    years = pd.to_datetime(year_columns, format="%Y")
 
-    ########################### Data Visualization  #########################################
+    # Plot GDP trends for top 5 countries (argpartition on the latest year)
+    top_countries = filled.top_n(5, year_columns[-1])
 
-    # Set the style for better-looking plots
-    plt.style.use("seaborn-v0_8")
+    for i in top_countries:
+        plt.plot(years, filled.values[i], marker="o", label=filled.countries[i])
 
-    # 1. Line Chart: GDP Trends Over Time
-    print("\n=== Creating Visualizations ===")
-    plt.figure(figsize=(12, 6))
+    plt.title("GDP Trends (2020-2025) - Top 5 Countries", fontsize=14, pad=20)
+    plt.xlabel("Year", fontsize=12)
+    plt.ylabel("GDP (in Trillions USD)", fontsize=12)
+    plt.legend(title="Country")
+    plt.grid(True, linestyle="--", alpha=0.7)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+    if show:
+        plt.show()
+    plt.close()
+    return True
 
-    # Get year columns (assuming they are in format YYYY)
-    year_columns = [col for col in df_filled.columns if col.isdigit() and len(col) == 4]
 
-    # Convert years to datetime for better x-axis
-    if year_columns:
-        years = pd.to_datetime(year_columns, format="%Y")
-
-        # Plot GDP trends for top 5 countries
-        top_countries = df_filled.nlargest(5, year_columns[-1])  # Top 5 by latest year
-
-        for _, row in top_countries.iterrows():
-            plt.plot(
-                years, row[year_columns], marker="o", label=row["Country"]
-            )  # Assuming 'Country' column exists
-
-        plt.title("GDP Trends (2020-2025) - Top 5 Countries", fontsize=14, pad=20)
-        plt.xlabel("Year", fontsize=12)
-        plt.ylabel("GDP (in Trillions USD)", fontsize=12)
-        plt.legend(title="Country")
-        plt.grid(True, linestyle="--", alpha=0.7)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig("gdp_trends-line_chart.png")
-        plt.show()
-        plt.close()
-        print("- Created line chart: gdp_trends-line_chart.png")
+def bar_chart(filled, df_filled, path, show=False):
+    """2. Bar Chart: Group by first letter of country name"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    # 2. Bar Chart: Group by first letter of country name
-    plt.figure(figsize=(12, 6))
+    year_columns = get_year_columns(df_filled)
+    if not year_columns:
+        return False
 
-    # Create a new column for the first letter of each country
-    df_filled["First_Letter"] = df_filled["Country"].str[0]
+    plt.figure(figsize=(12, 6))
 
     # Get the latest year with data
     latest_year = year_columns[-1]
 
-    # Calculate average GDP by first letter
-    avg_gdp = (
-        df_filled.groupby("First_Letter")[latest_year]
-        .mean()
-        .sort_values(ascending=False)
-    )
+    # Calculate average GDP by first letter of each country
+    avg_gdp = filled.group_aggregate(
+        filled.first_letter_keys(), latest_year, "mean"
+    ).sort_values(ascending=False)
 
     # Create bar plot
     ax = sns.barplot(x=avg_gdp.index, y=avg_gdp.values, palette="viridis")
@@ -121,64 +99,155 @@ def main():
     plt.ylabel("Average GDP (in Millions USD)", fontsize=12)
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig("gdp_by_first_letter-bar_chart.png")
-    plt.show()
+    plt.savefig(path)
+    if show:
+        plt.show()
     plt.close()
-    print("- Created bar chart: gdp_by_first_letter-bar_chart.png")
+    return True
+
+
+def histogram(filled, df_filled, path, show=False):
+    """3. Histogram: Distribution of GDP"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    year_columns = get_year_columns(df_filled)
+    if not year_columns:
+        return False
 
-    # 3. Histogram: Distribution of GDP
     plt.figure(figsize=(10, 6))
-    if year_columns:
-        latest_year = year_columns[-1]
-        sns.histplot(data=df_filled[latest_year], bins=20, kde=True, color="skyblue")
-        plt.title(f"Distribution of GDP Values ({latest_year})", fontsize=14, pad=20)
-        plt.xlabel("GDP (in Trillions USD)", fontsize=12)
-        plt.ylabel("Number of Countries", fontsize=12)
-        plt.grid(True, linestyle="--", alpha=0.3)
-        plt.tight_layout()
-        plt.savefig("gdp_distribution-histogram.png")
+    latest_year = year_columns[-1]
+    sns.histplot(data=df_filled[latest_year], bins=20, kde=True, color="skyblue")
+    plt.title(f"Distribution of GDP Values ({latest_year})", fontsize=14, pad=20)
+    plt.xlabel("GDP (in Trillions USD)", fontsize=12)
+    plt.ylabel("Number of Countries", fontsize=12)
+    plt.grid(True, linestyle="--", alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path)
+    if show:
         plt.show()
-        plt.close()
-        print("- Created histogram: gdp_distribution-histogram.png")
-
-    # 4. Scatter Plot: compare gdp between two years
-    if len(year_columns) >= 2:
-        plt.figure(figsize=(10, 8))
-
-        # Use the first and last years for comparison
-        year1 = year_columns[0]
-        year2 = year_columns[-1]
-
-        # Create scatter plot
-        sns.scatterplot(
-            data=df_filled,
-            x=year1,
-            y=year2,
-            hue="Country",
-            size=year2,  # Size points by the latest year's GDP
-            sizes=(20, 200),
-            alpha=0.7,
-            legend=False,
-        )
+    plt.close()
+    return True
+
+
+def scatter_plot(filled, df_filled, path, show=False):
+    """4. Scatter Plot: compare gdp between two years"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    year_columns = get_year_columns(df_filled)
+    if len(year_columns) < 2:
+        return False
+
+    plt.figure(figsize=(10, 8))
+
+    # Use the first and last years for comparison
+    year1 = year_columns[0]
+    year2 = year_columns[-1]
+
+    # Create scatter plot
+    sns.scatterplot(
+        data=df_filled,
+        x=year1,
+        y=year2,
+        hue="Country",
+        size=year2,  # Size points by the latest year's GDP
+        sizes=(20, 200),
+        alpha=0.7,
+        legend=False,
+    )
 
-        # Add a diagonal line for reference
-        max_val = max(df_filled[[year1, year2]].max())
-        plt.plot([0, max_val], [0, max_val], "r--", alpha=0.5)
+    # Add a diagonal line for reference
+    max_val = max(df_filled[[year1, year2]].max())
+    plt.plot([0, max_val], [0, max_val], "r--", alpha=0.5)
 
-        plt.title(f"GDP Comparison: {year1} vs {year2}", fontsize=14, pad=20)
-        plt.xlabel(f"GDP in {year1} (Millions USD)", fontsize=12)
-        plt.ylabel(f"GDP in {year2} (Millions USD)", fontsize=12)
-        plt.grid(True, linestyle="--", alpha=0.3)
-        plt.tight_layout()
-        plt.savefig("gdp_comparison-scatter_plot.png")
+    plt.title(f"GDP Comparison: {year1} vs {year2}", fontsize=14, pad=20)
+    plt.xlabel(f"GDP in {year1} (Millions USD)", fontsize=12)
+    plt.ylabel(f"GDP in {year2} (Millions USD)", fontsize=12)
+    plt.grid(True, linestyle="--", alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path)
+    if show:
         plt.show()
-        plt.close()
+    plt.close()
+    return True
+
+
+# Chart name -> (output file, drawing function)
+CHARTS = {
+    "line": ("gdp_trends-line_chart.png", line_chart),
+    "bar": ("gdp_by_first_letter-bar_chart.png", bar_chart),
+    "histogram": ("gdp_distribution-histogram.png", histogram),
+    "scatter": ("gdp_comparison-scatter_plot.png", scatter_plot),
+}
+
+
+def main(text_only=False):
+
+    # Load the dataset using pandas, and clean it
+    df, filled, df_filled = load_and_clean("CountryGDP-2020-2025.csv")
+
+    # Display first ten rows
+    print("\nFirst 5 rows:")
+    print(df.head())
+
+    # Explore the dataset structure
+    print("\n=== Dataset Information ===")
+    print(f"Shape of the dataset: {df.shape}")
+
+    print("\n=== Data Types ===")
+    print(df.dtypes)
+
+    # Check for missing values
+    print("\n=== Missing Values ===")
+    missing_values = df.isnull().sum()
+    print(missing_values[missing_values > 0])  # Only show columns with missing values
+
+    # Handle missing values
+    # For years with missing GDP values, use forward fill (fill with previous year's value)
+    print("\n=== Handling Missing Values ===")
+    print("Filling missing values using forward fill...")
+
+    # Verify if any missing values remain
+    print("\nMissing values after filling:")
+    print(df_filled.isnull().sum().sum(), "missing values remaining")
+
+    # Display the cleaned data
+    print("\n=== First 5 rows of cleaned data ===")
+    print(df_filled.head())
+
+    # Basic statistics of the cleaned data
+    print("\n=== Basic Statistics ===")
+    print(df_filled.describe())
+
+    # Text-only report stops here, before anything imports matplotlib
+    if text_only:
+        return
+
+    import matplotlib.pyplot as plt
+
+    # Set the style for better-looking plots
+    plt.style.use("seaborn-v0_8")
+
+    print("\n=== Creating Visualizations ===")
+    if line_chart(filled, df_filled, "gdp_trends-line_chart.png", show=True):
+        print("- Created line chart: gdp_trends-line_chart.png")
+
+    if bar_chart(filled, df_filled, "gdp_by_first_letter-bar_chart.png", show=True):
+        print("- Created bar chart: gdp_by_first_letter-bar_chart.png")
+
+    if histogram(filled, df_filled, "gdp_distribution-histogram.png", show=True):
+        print("- Created histogram: gdp_distribution-histogram.png")
+
+    if scatter_plot(filled, df_filled, "gdp_comparison-scatter_plot.png", show=True):
+        year_columns = get_year_columns(df_filled)
         print(
-            f"- Created scatter plot: gdp_comparison-scatter_plot.png (comparing {year1} and {year2})"
+            f"- Created scatter plot: gdp_comparison-scatter_plot.png (comparing {year_columns[0]} and {year_columns[-1]})"
         )
 
     print("\nAll visualizations have been saved as PNG files.")
 
 
 if __name__ == "__main__":
-    main()
+    os.system("cls" if os.name == "nt" else "clear")  # Clear terminal
+    main(text_only="--text" in sys.argv)  # --text: report only, no charts
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+FILL_METHODS = ("ffill", "linear", "cagr")
+
+
+def _last_valid_index(valid):
+    """For each cell, the column index of the last valid value at or before it (-1 if none)"""
+    cols = np.arange(valid.shape[1])
+    idx = np.where(valid, cols, -1)
+    return np.maximum.accumulate(idx, axis=1)
+
+
+def _next_valid_index(valid):
+    """For each cell, the column index of the next valid value at or after it (ncols if none)"""
+    ncols = valid.shape[1]
+    cols = np.arange(ncols)
+    idx = np.where(valid, cols, ncols)
+    return np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+
+
+class GDPPanel:
+    """
+    GDP as a float64 matrix of countries x periods plus a country index.
+
+    All cleaning and analytics work on the whole matrix at once with NumPy,
+    so the cost does not depend on Python loops over countries or years.
+    Periods can be years or finer (e.g. quarters) - they just need to be
+    equally spaced for the CAGR extrapolation.
+    """
+
+    def __init__(self, values, countries, periods):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.countries = np.asarray(countries, dtype=object)
+        self.periods = list(periods)
+
+    @classmethod
+    def from_frame(cls, df, id_column="Country"):
+        """Use every column except id_column as a period"""
+        periods = [col for col in df.columns if col != id_column]
+        return cls(df[periods].to_numpy(dtype=np.float64), df[id_column].to_numpy(), periods)
+
+    @classmethod
+    def from_csv(cls, path, id_column="Country"):
+        return cls.from_frame(pd.read_csv(path), id_column)
+
+    def to_frame(self, id_column="Country"):
+        df = pd.DataFrame(self.values, columns=self.periods)
+        df.insert(0, id_column, self.countries)
+        return df
+
+    def copy(self, values=None):
+        return GDPPanel(self.values.copy() if values is None else values, self.countries, self.periods)
+
+    def missing_count(self):
+        return int(np.isnan(self.values).sum())
+
+    # ---- gap filling ----
+
+    def fill_forward(self):
+        """Fill each gap with the previous period's value (row-wise ffill)"""
+        valid = ~np.isnan(self.values)
+        prev = _last_valid_index(valid)
+        rows = np.arange(self.values.shape[0])[:, None]
+        filled = self.values[rows, np.maximum(prev, 0)]
+        filled[prev < 0] = np.nan
+        return self.copy(filled)
+
+    def fill_backward(self):
+        """Fill each gap with the next period's value (row-wise bfill)"""
+        valid = ~np.isnan(self.values)
+        nxt = _next_valid_index(valid)
+        ncols = self.values.shape[1]
+        rows = np.arange(self.values.shape[0])[:, None]
+        filled = self.values[rows, np.minimum(nxt, ncols - 1)]
+        filled[nxt >= ncols] = np.nan
+        return self.copy(filled)
+
+    def interpolate_linear(self):
+        """Fill interior gaps on the straight line between the surrounding values"""
+        values = self.values
+        valid = ~np.isnan(values)
+        prev = _last_valid_index(valid)
+        nxt = _next_valid_index(valid)
+        ncols = values.shape[1]
+        interior = ~valid & (prev >= 0) & (nxt < ncols)
+
+        rows = np.arange(values.shape[0])[:, None]
+        left = values[rows, np.maximum(prev, 0)]
+        right = values[rows, np.minimum(nxt, ncols - 1)]
+        cols = np.arange(ncols)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = (cols - prev) / (nxt - prev)
+        filled = values.copy()
+        filled[interior] = (left + (right - left) * weight)[interior]
+        return self.copy(filled)
+
+    def extrapolate_cagr(self, window=3):
+        """
+        Fill trailing gaps by compounding the country's recent growth rate.
+
+        The rate is the CAGR between the last valid value and the valid value
+        up to `window` periods before it. Rows with fewer than two valid values,
+        or a non-positive base value, fall back to carrying the last value forward.
+        """
+        values = self.values
+        valid = ~np.isnan(values)
+        nrows, ncols = values.shape
+        rows = np.arange(nrows)
+
+        last = _last_valid_index(valid)[:, -1]
+        has_last = last >= 0
+        last_value = values[rows, np.maximum(last, 0)]
+
+        # Earliest valid value inside the window that ends at `last`
+        cols = np.arange(ncols)
+        in_window = valid & (cols >= (last - window)[:, None]) & (cols < last[:, None])
+        first = np.where(in_window.any(axis=1), np.argmax(in_window, axis=1), -1)
+        first_value = values[rows, np.maximum(first, 0)]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = (last_value / first_value) ** (1.0 / (last - first)) - 1.0
+        rate = np.where((first >= 0) & (first_value > 0) & (last_value > 0), rate, 0.0)
+
+        trailing = has_last[:, None] & (cols > last[:, None])
+        steps = cols - last[:, None]
+        projected = last_value[:, None] * (1.0 + rate[:, None]) ** steps
+        filled = values.copy()
+        filled[trailing] = projected[trailing]
+        return self.copy(filled)
+
+    def fill(self, method="ffill"):
+        """
+        Fill every gap.
+
+        "ffill"   forward fill then backward fill (what data_analysis.py did)
+        "linear"  linear interpolation inside, forward fill at the end, backward fill at the start
+        "cagr"    linear interpolation inside, CAGR extrapolation at the end, backward fill at the start
+        """
+        if method == "ffill":
+            return self.fill_forward().fill_backward()
+        if method == "linear":
+            return self.interpolate_linear().fill_forward().fill_backward()
+        if method == "cagr":
+            return self.interpolate_linear().extrapolate_cagr().fill_backward()
+        raise ValueError(f"Unknown fill method {method!r}, use one of {FILL_METHODS}")
+
+    # ---- analytics ----
+
+    def column(self, period=-1):
+        """Values for one period, by label or position (default: latest)"""
+        if period in self.periods:
+            period = self.periods.index(period)
+        return self.values[:, period]
+
+    def top_n(self, n=5, period=-1):
+        """Row indices of the n largest values in a period, largest first (NaN ranks last)"""
+        col = self.column(period)
+        col = np.where(np.isnan(col), -np.inf, col)
+        n = min(n, len(col))
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        part = np.argpartition(-col, n - 1)[:n]
+        return part[np.argsort(-col[part], kind="stable")]
+
+    def first_letter_keys(self):
+        # Casting to a 1-character string dtype keeps just the first letter
+        return self.countries.astype(str).astype("<U1")
+
+    def group_aggregate(self, keys, period=-1, func="mean"):
+        """
+        Aggregate one period by group key (e.g. first_letter_keys()).
+
+        func is "mean", "sum", "count", "min" or "max"; NaNs are ignored.
+        Returns a pandas Series indexed by key.
+        """
+        col = self.column(period)
+        groups, inverse = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+        valid = ~np.isnan(col)
+        counts = np.bincount(inverse[valid], minlength=len(groups)).astype(np.float64)
+        if func in ("mean", "sum"):
+            sums = np.bincount(inverse[valid], weights=col[valid], minlength=len(groups))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result = sums / counts if func == "mean" else sums
+        elif func == "count":
+            result = counts
+        elif func in ("min", "max"):
+            fill = np.inf if func == "min" else -np.inf
+            result = np.full(len(groups), fill)
+            ufunc = np.minimum if func == "min" else np.maximum
+            ufunc.at(result, inverse[valid], col[valid])
+            result[counts == 0] = np.nan
+        else:
+            raise ValueError(f"Unknown aggregation {func!r}")
+        return pd.Series(result, index=groups)
@@ -1,9 +1,25 @@
+import sys
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
 
-# Load our data into a pandas dataframe
-df = pd.read_csv('car_sales_data.csv')
+from car_data import load_car_sales
+
+# Streaming mode: one chunked pass over the CSV, text report only
+# usage: python Frameworks_Assignment.py --stream [file.csv] [--chunksize N]
+if '--stream' in sys.argv:
+    from streaming_eda import main
+    main([arg for arg in sys.argv[1:] if arg != '--stream'])
+    sys.exit()
+
+# Sharded mode: aggregate a directory of CSV shards in a process pool
+# usage: python Frameworks_Assignment.py --shards DIR [--workers N]
+if '--shards' in sys.argv:
+    from parallel_eda import main
+    main([arg for arg in sys.argv[1:] if arg != '--shards'])
+    sys.exit()
+
+# Load our data into a pandas dataframe (typed columns, cached snapshot)
+df = load_car_sales('car_sales_data.csv')
 
 # show the first few rows
 print(df.head())
@@ -57,14 +73,24 @@ print(yearly_counts)
 
 # A detailed view including manufacturer
 print("\n=== Top 10 Best Selling Car Models (with Manufacturer) ===")
-top_cars_detailed = df.groupby(['Manufacturer', 'Model']).size().sort_values(ascending=False).head(10)
+top_cars_detailed = df.groupby(['Manufacturer', 'Model'], observed=True).size().nlargest(10)  # partial sort, not a full one
 print(top_cars_detailed)
 
 
 #--------------VISUALIZATIONS---------------------------------------------------------------------
 
-# Plotting number of car sales over time
+# Text-only mode: stop before the charts so the plotting stack is never imported
+# usage: python Frameworks_Assignment.py --text
+if '--text' in sys.argv:
+    correlation = df['Price'].corr(df['Mileage'])
+    print(f"\nCorrelation between Price and Mileage: {correlation:.2f}")
+    sys.exit()
+
+# Plotting number of car sales over time (imported here so text runs skip it)
 import matplotlib.pyplot as plt
+import numpy as np
+
+from charts import plot_price_vs_mileage
 
 # Count cars by year of manufacture
 yearly_sales = df['Year of manufacture'].value_counts().sort_index()
@@ -127,14 +153,8 @@ plt.show()
 plt.figure(figsize=(12, 7))
 
 # Create the scatter plot with color mapping based on engine size
-scatter = plt.scatter(
-    x=df['Mileage'],
-    y=df['Price'],
-    c=df['Engine size'],  # Color points by engine size
-    cmap='viridis',
-    alpha=0.6,
-    s=20  # Size of points
-)
+# (large tables are drawn as a density image instead of one dot per row)
+scatter = plot_price_vs_mileage(plt.gca(), df['Mileage'], df['Price'], df['Engine size'])
 
 # Add colorbar
 cbar = plt.colorbar(scatter)
@@ -147,11 +167,6 @@ plt.ylabel('Price ($)', fontsize=12)
 plt.grid(True, linestyle='--', alpha=0.6)
 plt.tight_layout()
 
-# Add a trendline for better visualization of the relationship
-z = np.polyfit(df['Mileage'], df['Price'], 1)
-p = np.poly1d(z)
-plt.plot(df['Mileage'], p(df['Mileage']), 'r--', linewidth=2)
-
 plt.show()
 
 # Calculate and print correlation coefficient
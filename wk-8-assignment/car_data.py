@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+CSV_PATH = "car_sales_data.csv"
+SNAPSHOT_DIR = ".snapshots"
+
+# Pinned column types for car_sales_data.csv
+# (default inference gives object / int64 / float64 which wastes a lot of memory)
+CAR_SALES_DTYPES = {
+    "Manufacturer": "category",
+    "Model": "category",
+    "Engine size": "float32",
+    "Fuel type": "category",
+    "Year of manufacture": "int16",
+    "Mileage": "int32",
+    "Price": "int32",
+}
+
+
+def _feather():
+    """pyarrow.feather, imported on first use; None when pyarrow is not installed"""
+    # pyarrow is optional - without it we just parse the CSV every time
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return None
+    return feather
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash a file in blocks so we never hold the whole file in memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_car_sales_csv(path=CSV_PATH, **kwargs):
+    """Parse the CSV with the pinned dtypes"""
+    return pd.read_csv(path, dtype=CAR_SALES_DTYPES, **kwargs)
+
+
+def csv_fingerprint(path, snapshot_dir):
+    """Return the sha256 of the CSV, re-hashing only when its mtime or size changed"""
+    stat = os.stat(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    key_path = os.path.join(snapshot_dir, f"{stem}.key.json")
+
+    try:
+        with open(key_path) as f:
+            key = json.load(f)
+        if key["mtime_ns"] == stat.st_mtime_ns and key["size"] == stat.st_size:
+            return key["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    sha256 = file_sha256(path)
+    key = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256}
+    with open(key_path, "w") as f:
+        json.dump(key, f)
+    return sha256
+
+
+def snapshot_dir_for(path, snapshot_dir):
+    """The folder for the CSV's snapshots and hash key (created if needed); `snapshot_dir` overrides it"""
+    if snapshot_dir is None:
+        snapshot_dir = os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIR)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    return snapshot_dir
+
+
+def data_version(path=CSV_PATH, snapshot_dir=None):
+    """Content hash of the CSV (only recomputed when the file changes), for cache keys"""
+    return csv_fingerprint(path, snapshot_dir_for(path, snapshot_dir))
+
+
+def snapshot_path(path=CSV_PATH, snapshot_dir=None):
+    """Path of the Feather snapshot for the current contents of the CSV"""
+    snapshot_dir = snapshot_dir_for(path, snapshot_dir)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    sha256 = csv_fingerprint(path, snapshot_dir)
+    return os.path.join(snapshot_dir, f"{stem}-{sha256[:16]}.feather")
+
+
+def load_car_sales(path=CSV_PATH, use_snapshot=True, snapshot_dir=None):
+    """
+    Load car_sales_data.csv with compact dtypes.
+
+    The first load writes a Feather snapshot next to the CSV, keyed on the
+    file's contents. Later loads memory-map the snapshot instead of parsing
+    the CSV again. Falls back to a plain CSV parse when pyarrow is missing.
+    """
+    feather = _feather() if use_snapshot else None
+    if feather is None:
+        return read_car_sales_csv(path)
+
+    snap = snapshot_path(path, snapshot_dir)
+    if os.path.exists(snap):
+        try:
+            return feather.read_table(snap, memory_map=True).to_pandas()
+        except Exception:
+            # A half-written or corrupt snapshot - rebuild it below
+            pass
+
+    df = read_car_sales_csv(path)
+
+    # Remove snapshots of older versions of the same CSV
+    stem = os.path.splitext(os.path.basename(path))[0]
+    folder = os.path.dirname(snap)
+    for name in os.listdir(folder):
+        if name.startswith(f"{stem}-") and name.endswith(".feather"):
+            os.remove(os.path.join(folder, name))
+
+    # Write to a temp file first so a crash never leaves a broken snapshot
+    tmp = snap + ".tmp"
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, snap)
+    return df
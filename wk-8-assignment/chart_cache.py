@@ -0,0 +1,135 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def chart_key(chart, data_version, all_choices=None, **state):
+    """
+    Canonical cache key for one chart.
+
+    The filter state is serialised as sorted JSON (lists of choices are sorted
+    too), so the same selection made in a different order maps to the same key.
+    all_choices maps a multi-select to all of its options: selecting none of
+    them filters nothing, like selecting every one, so both are stored as "all".
+    """
+    all_choices = all_choices or {}
+    canonical = {}
+    for name, value in state.items():
+        if name in all_choices and (not value or set(value) >= set(all_choices[name])):
+            value = "all"
+        elif isinstance(value, (list, set, frozenset)):
+            value = sorted(value)
+        elif isinstance(value, tuple):
+            value = list(value)
+        canonical[name] = value
+    payload = json.dumps(
+        {"chart": chart, "data": data_version, "state": canonical}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def figure_to_png(fig, dpi=100):
+    """Rasterise a matplotlib figure to PNG bytes and free it"""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+class ChartCache:
+    """
+    Bounded LRU cache of rendered chart PNGs, shared by all sessions.
+
+    Entries older than ttl_seconds (if set) count as misses. With disk_dir set,
+    PNGs are also written to disk so other processes and restarts can reuse
+    them. All methods are thread safe.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=None, disk_dir=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # key -> (created, png bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _expired(self, created):
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.png")
+
+    def _store(self, key, created, png):
+        self._entries[key] = (created, png)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """PNG bytes for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if self.disk_dir:
+                path = self._disk_path(key)
+                try:
+                    created = os.path.getmtime(path)
+                    if not self._expired(created):
+                        with open(path, "rb") as f:
+                            png = f.read()
+                        self._store(key, created, png)
+                        self.disk_hits += 1
+                        return png
+                except OSError:
+                    pass
+
+            self.misses += 1
+            return None
+
+    def put(self, key, png):
+        created = time.time()
+        with self._lock:
+            self._store(key, created, png)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+
+    def get_or_render(self, key, make_figure):
+        """Cached PNG for key; on a miss, call make_figure() and rasterise the figure it returns"""
+        png = self.get(key)
+        if png is None:
+            png = figure_to_png(make_figure())
+            self.put(key, png)
+        return png
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,103 @@
+import numpy as np
+
+# Above this many points the scatter is swapped for a density view
+SCATTER_MAX_POINTS = 20_000
+
+RENDER_MODES = ("auto", "scatter", "sample", "hexbin", "density")
+
+
+def stratified_sample(x, y, max_points=SCATTER_MAX_POINTS, bins=50, seed=0):
+    """
+    Indices of at most ~max_points rows, sampled per cell of a bins x bins grid.
+
+    Every cell keeps a share proportional to its size (at least one row), so
+    sparse regions and outliers stay visible, unlike a plain random sample.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    def bin_ids(values):
+        lo, hi = values.min(), values.max()
+        if hi == lo:
+            return np.zeros(len(values), dtype=np.int64)
+        ids = ((values - lo) / (hi - lo) * bins).astype(np.int64)
+        return np.minimum(ids, bins - 1)
+
+    cell = bin_ids(x) * bins + bin_ids(y)
+    cell_sizes = np.bincount(cell, minlength=bins * bins)
+    quota = np.maximum(np.ceil(cell_sizes * (max_points / n)), 1).astype(np.int64)
+
+    # Random order inside each cell, then keep the first `quota` rows of each
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(n), cell))
+    sorted_cells = cell[order]
+    starts = np.searchsorted(sorted_cells, sorted_cells, side="left")
+    rank = np.arange(n) - starts
+    keep = order[rank < quota[sorted_cells]]
+    return np.sort(keep)
+
+
+def plot_price_vs_mileage(
+    ax, mileage, price, engine_size, fit=None, mode="auto", max_points=SCATTER_MAX_POINTS
+):
+    """
+    Draw Price vs Mileage coloured by engine size and return the mappable for a colorbar.
+
+    mode:
+        "scatter"  every row (the original chart)
+        "sample"   stratified sample of about max_points rows
+        "hexbin"   hexagonal bins coloured by mean engine size
+        "density"  2D histogram image coloured by mean engine size
+        "auto"     "scatter" up to max_points rows, "hexbin" above that
+
+    fit is (slope, intercept); when missing it is computed with np.polyfit.
+    The trendline is drawn from its two endpoints only.
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode {mode!r}, use one of {RENDER_MODES}")
+
+    mileage = np.asarray(mileage, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    engine_size = np.asarray(engine_size, dtype=np.float64)
+
+    if mode == "auto" or len(mileage) == 0:
+        # An empty selection always gets the (empty) scatter: hexbin and the
+        # 2D histogram cannot bin zero points
+        mode = "scatter" if len(mileage) <= max_points else "hexbin"
+
+    if mode in ("scatter", "sample"):
+        if mode == "sample":
+            keep = stratified_sample(mileage, price, max_points)
+            mileage_shown, price_shown, engine_shown = mileage[keep], price[keep], engine_size[keep]
+        else:
+            mileage_shown, price_shown, engine_shown = mileage, price, engine_size
+        mappable = ax.scatter(
+            x=mileage_shown, y=price_shown, c=engine_shown, cmap="viridis", alpha=0.6, s=20
+        )
+    elif mode == "hexbin":
+        mappable = ax.hexbin(
+            mileage, price, C=engine_size, reduce_C_function=np.mean,
+            gridsize=80, cmap="viridis", mincnt=1,
+        )
+    else:
+        counts, x_edges, y_edges = np.histogram2d(mileage, price, bins=200)
+        sums, _, _ = np.histogram2d(mileage, price, bins=[x_edges, y_edges], weights=engine_size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_engine = np.where(counts > 0, sums / counts, np.nan)
+        mappable = ax.imshow(
+            mean_engine.T, origin="lower", aspect="auto", cmap="viridis", interpolation="nearest",
+            extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+        )
+
+    # Trendline from its two endpoints
+    if len(mileage) >= 2:
+        if fit is None:
+            fit = np.polyfit(mileage, price, 1)
+        line = np.poly1d(fit)
+        x_ends = np.array([mileage.min(), mileage.max()])
+        ax.plot(x_ends, line(x_ends), "r--", linewidth=2)
+
+    return mappable
@@ -0,0 +1,214 @@
+import os
+
+import pandas as pd
+
+from car_data import CSV_PATH, csv_fingerprint, snapshot_dir_for
+from top_k import top_k_weighted
+
+# Column types for the Parquet store (same widths as car_data.CAR_SALES_DTYPES)
+CAR_SALES_SQL_TYPES = {
+    "Manufacturer": "VARCHAR",
+    "Model": "VARCHAR",
+    "Engine size": "FLOAT",
+    "Fuel type": "VARCHAR",
+    "Year of manufacture": "SMALLINT",
+    "Mileage": "INTEGER",
+    "Price": "INTEGER",
+}
+
+
+def _duckdb():
+    """The duckdb module, imported on first use (it is an optional dependency)"""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("the out-of-core backend needs duckdb: pip install duckdb") from e
+    return duckdb
+
+
+def _quote(value):
+    """SQL string literal (for paths, which DuckDB cannot take as parameters in every position)"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def parquet_snapshot(path=CSV_PATH, snapshot_dir=None):
+    """
+    Path of a Parquet copy of the CSV, written by DuckDB on first use.
+
+    The conversion streams the CSV through DuckDB, so it never needs the whole
+    file in memory. Rows are ordered by year, which gives every row group a
+    narrow year range and lets year filters skip most of the file. Like the
+    Feather snapshot it is keyed on the CSV's contents.
+    """
+    snapshot_dir = snapshot_dir_for(path, snapshot_dir)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    sha256 = csv_fingerprint(path, snapshot_dir)
+    snap = os.path.join(snapshot_dir, f"{stem}-{sha256[:16]}.parquet")
+    if os.path.exists(snap):
+        return snap
+
+    # Remove Parquet copies of older versions of the same CSV
+    for name in os.listdir(snapshot_dir):
+        if name.startswith(f"{stem}-") and name.endswith(".parquet"):
+            os.remove(os.path.join(snapshot_dir, name))
+
+    columns = ", ".join(f"{_quote(name)}: {_quote(kind)}" for name, kind in CAR_SALES_SQL_TYPES.items())
+    tmp = snap + ".tmp"
+    con = _duckdb().connect()
+    try:
+        con.execute(
+            f"COPY (SELECT * FROM read_csv({_quote(path)}, header = true, columns = {{{columns}}}) "
+            f'ORDER BY "Year of manufacture") TO {_quote(tmp)} (FORMAT parquet, COMPRESSION zstd)'
+        )
+    finally:
+        con.close()
+    os.replace(tmp, snap)
+    return snap
+
+
+class SalesStore:
+    """
+    Car sales kept on disk as Parquet and queried with DuckDB.
+
+    Only query results come back to Python: filters and aggregations run
+    inside DuckDB, which reads just the columns and row groups it needs and
+    spills to disk when a query does not fit in `memory_limit`. The store is
+    safe to share between threads (each query uses its own cursor).
+
+    source is a Parquet file or glob, e.g. "sales/*.parquet".
+    """
+
+    def __init__(self, source, memory_limit=None, threads=None):
+        self.source = source
+        self.con = _duckdb().connect()
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = {_quote(memory_limit)}")
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        self.con.execute(f"CREATE VIEW sales AS SELECT * FROM read_parquet({_quote(source)})")
+
+    @classmethod
+    def from_csv(cls, path=CSV_PATH, snapshot_dir=None, **kwargs):
+        return cls(parquet_snapshot(path, snapshot_dir), **kwargs)
+
+    def query(self, sql, params=None):
+        """Run a query and return the (small) result as a DataFrame"""
+        cursor = self.con.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def year_bounds(self):
+        row = self.query('SELECT min("Year of manufacture") AS lo, max("Year of manufacture") AS hi FROM sales')
+        return int(row["lo"][0]), int(row["hi"][0])
+
+    def manufacturers(self):
+        return self.query("SELECT DISTINCT Manufacturer FROM sales ORDER BY Manufacturer")["Manufacturer"].tolist()
+
+    def filter(self, year_range=None, manufacturers=None):
+        """Filtered view with the SalesCube query methods"""
+        return SalesQuery(self, year_range, manufacturers)
+
+
+class SalesQuery:
+    """
+    Filtered car sales answered by DuckDB.
+
+    Has the same methods as a filtered SalesCube, so the dashboard can use
+    either. The count, means, correlation and fit come from one aggregate
+    query that is run on first use.
+    """
+
+    def __init__(self, store, year_range=None, manufacturers=None):
+        self.store = store
+        conditions, self.params = [], []
+        if year_range is not None:
+            conditions.append('"Year of manufacture" BETWEEN ? AND ?')
+            self.params += [int(year_range[0]), int(year_range[1])]
+        if manufacturers:
+            conditions.append(f"Manufacturer IN ({', '.join('?' * len(manufacturers))})")
+            self.params += list(manufacturers)
+        self.where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        self._summary = None
+
+    def _query(self, sql):
+        return self.store.query(sql.format(where=self.where), self.params)
+
+    def summary(self):
+        if self._summary is None:
+            self._summary = self._query(
+                """
+                SELECT count(*) AS count,
+                       avg(Price) AS mean_price,
+                       avg(Mileage) AS mean_mileage,
+                       corr(Price, Mileage) AS correlation,
+                       regr_slope(Price, Mileage) AS slope,
+                       regr_intercept(Price, Mileage) AS intercept
+                FROM sales {where}
+                """
+            ).iloc[0]
+        return self._summary
+
+    def count(self):
+        return int(self.summary()["count"])
+
+    def mean_price(self):
+        return float(self.summary()["mean_price"])
+
+    def mean_mileage(self):
+        return float(self.summary()["mean_mileage"])
+
+    def yearly_counts(self):
+        """Same result as df['Year of manufacture'].value_counts().sort_index()"""
+        counts = self._query(
+            'SELECT "Year of manufacture", count(*) AS count FROM sales {where} '
+            'GROUP BY "Year of manufacture" ORDER BY "Year of manufacture"'
+        )
+        return counts.set_index("Year of manufacture")["count"]
+
+    def top_models(self, n=10, method="exact"):
+        """
+        Same result as df['Model'].value_counts().head(n).
+
+        "exact" is a GROUP BY ... LIMIT n in DuckDB; the sketch methods run
+        over the per-model counts, like SalesCube.top_models.
+        """
+        if method != "exact":
+            counts = self._query("SELECT Model, count(*) AS count FROM sales {where} GROUP BY Model")
+            return top_k_weighted(counts["Model"], counts["count"], n, method, names=["Model"])
+        counts = self._query(
+            f"SELECT Model, count(*) AS count FROM sales {{where}} GROUP BY Model ORDER BY count DESC, Model LIMIT {int(n)}"
+        )
+        return counts.set_index("Model")["count"]
+
+    def correlation(self):
+        """Pearson correlation of Price and Mileage"""
+        value = self.summary()["correlation"]
+        return float(value) if pd.notna(value) else float("nan")
+
+    def linear_fit(self):
+        """Least squares Price = slope * Mileage + intercept, like np.polyfit(x, y, 1)"""
+        s = self.summary()
+        if pd.isna(s["slope"]):
+            return float("nan"), float("nan")
+        return float(s["slope"]), float(s["intercept"])
+
+    def sample_rows(self, n=10):
+        """First n matching rows"""
+        return self._query(f"SELECT * FROM sales {{where}} LIMIT {int(n)}")
+
+    def scatter_rows(self, max_rows=200_000):
+        """
+        Mileage, Price and Engine size of the matching rows for the scatter.
+
+        Above max_rows a repeatable reservoir sample of max_rows rows is
+        returned instead, so the chart never pulls the whole table into Python.
+        """
+        columns = 'Mileage, Price, "Engine size"'
+        if self.count() <= max_rows:
+            return self._query(f"SELECT {columns} FROM sales {{where}}")
+        return self._query(
+            f"SELECT * FROM (SELECT {columns} FROM sales {{where}}) "
+            f"USING SAMPLE reservoir({int(max_rows)} ROWS) REPEATABLE (0)"
+        )
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+def _group_positions(values):
+    """value -> ascending positions of the rows holding it (missing values are left out)"""
+    codes, uniques = values.factorize()
+    by_value = np.argsort(codes, kind="stable")  # positions grouped by value, ascending within
+    bounds = np.searchsorted(codes[by_value], np.arange(len(uniques) + 1))
+    return {value: by_value[bounds[i] : bounds[i + 1]] for i, value in enumerate(uniques)}
+
+
+def _interleave(old, new, order):
+    """old's values followed by new's, reordered by `order` (categoricals stay categorical)"""
+    if isinstance(old.dtype, pd.CategoricalDtype):
+        both = union_categoricals([old, new])
+        return pd.Categorical.from_codes(both.codes[order], dtype=both.dtype)
+    return np.concatenate([old.to_numpy(), new.to_numpy()])[order]
+
+
+class SalesFilterIndex:
+    """
+    Row index for the dashboard's year / manufacturer / fuel type filters.
+
+    Built once at load time:
+      - the rows are stably sorted by year, so a year range is the contiguous
+        slice [searchsorted(lo), searchsorted(hi, "right")) of the sorted frame
+      - for every manufacturer and fuel type, the sorted positions of its rows
+
+    A query slices the per-value position arrays to the year range with a
+    binary search and merges / intersects only those, so its cost depends on
+    how many rows are selected, not on the size of the table. Without a
+    manufacturer or fuel filter the result is a plain slice (no copy).
+
+    Appended rows are merged in with add_rows(), which sorts only the new rows.
+    """
+
+    def __init__(self, df, year_column="Year of manufacture", columns=("Manufacturer", "Fuel type")):
+        order = np.argsort(df[year_column].to_numpy(), kind="stable")
+        self.year_column = year_column
+        self.frame = df.take(order).reset_index(drop=True)
+        self.rows = order  # sorted position -> row number in df
+        self.years = self.frame[year_column].to_numpy()
+        self.positions = {column: _group_positions(self.frame[column]) for column in columns}
+
+    def add_rows(self, df):
+        """
+        Return an index that also holds the rows of df.
+
+        Gives the same result as indexing the old rows followed by df from
+        scratch, but only df is sorted: its rows are placed after the old rows
+        of the same year with a binary search, and the old positions are
+        shifted by the number of new rows in front of them.
+        """
+        if len(df) == 0:
+            return self
+        added_rows = np.argsort(df[self.year_column].to_numpy(), kind="stable")  # df's rows follow the old ones
+        added = df.take(added_rows).reset_index(drop=True)
+        before = np.searchsorted(self.years, added[self.year_column].to_numpy(), side="right")
+        new_at = before + np.arange(len(added))  # where the new rows go in the merged frame
+        old_at = np.arange(len(self)) + np.searchsorted(before, np.arange(len(self)), side="right")
+        order = np.empty(len(self) + len(added), dtype=np.intp)  # merged position -> row of old + added
+        order[old_at] = np.arange(len(self))
+        order[new_at] = np.arange(len(self), len(order))
+
+        merged = SalesFilterIndex.__new__(SalesFilterIndex)
+        merged.year_column = self.year_column
+        merged.rows = np.concatenate([self.rows, len(self) + added_rows])[order]
+        merged.frame = pd.DataFrame(
+            {column: _interleave(self.frame[column], added[column], order) for column in self.frame.columns}
+        )
+        merged.years = merged.frame[self.year_column].to_numpy()
+        merged.positions = {}
+        for column, old_positions in self.positions.items():
+            new_positions = _group_positions(added[column])
+            merged.positions[column] = {}
+            for value in list(old_positions) + [v for v in new_positions if v not in old_positions]:
+                parts = []
+                if value in old_positions:
+                    parts.append(old_at[old_positions[value]])
+                if value in new_positions:
+                    parts.append(new_at[new_positions[value]])
+                ids = np.concatenate(parts)
+                ids.sort(kind="mergesort")  # two sorted runs
+                merged.positions[column][value] = ids
+        return merged
+
+    def __len__(self):
+        return len(self.frame)
+
+    def year_slice(self, year_range):
+        """Start and stop row of the year range in the sorted frame"""
+        lo = int(np.searchsorted(self.years, year_range[0], side="left"))
+        hi = int(np.searchsorted(self.years, year_range[1], side="right"))
+        return lo, hi
+
+    def _matching(self, column, values, lo, hi):
+        """Sorted positions in [lo, hi) whose `column` is one of `values`"""
+        parts = []
+        for value in values:
+            ids = self.positions[column].get(value)
+            if ids is None:
+                continue
+            start, stop = np.searchsorted(ids, [lo, hi])
+            parts.append(ids[start:stop])
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        merged = np.concatenate(parts)
+        merged.sort(kind="mergesort")  # the parts are disjoint sorted runs
+        return merged
+
+    def positions_for(self, year_range, manufacturers=None, fuel_types=None):
+        """Row positions (in self.frame) that pass the filters, or a slice when only years filter"""
+        lo, hi = self.year_slice(year_range)
+        selected = None
+        for column, values in (("Manufacturer", manufacturers), ("Fuel type", fuel_types)):
+            if not values:
+                continue  # no selection means no filter, like the original dashboard
+            ids = self._matching(column, values, lo, hi)
+            selected = ids if selected is None else np.intersect1d(selected, ids, assume_unique=True)
+        return slice(lo, hi) if selected is None else selected
+
+    def query(self, year_range, manufacturers=None, fuel_types=None):
+        """The filtered rows: a zero-copy slice when possible, otherwise a take"""
+        positions = self.positions_for(year_range, manufacturers, fuel_types)
+        if isinstance(positions, slice):
+            return self.frame.iloc[positions]
+        return self.frame.take(positions)
+
+    def count(self, year_range, manufacturers=None, fuel_types=None):
+        positions = self.positions_for(year_range, manufacturers, fuel_types)
+        if isinstance(positions, slice):
+            return positions.stop - positions.start
+        return len(positions)
+
+    def first_rows(self, n, year_range, manufacturers=None, fuel_types=None):
+        """
+        First n matching rows in the order of the original frame, labelled with their row numbers.
+
+        Only the matching positions are looked at (a partial sort picks the n
+        lowest row numbers), never a mask over the whole table.
+        """
+        positions = self.positions_for(year_range, manufacturers, fuel_types)
+        if isinstance(positions, slice):
+            positions = np.arange(positions.start, positions.stop)
+        rows = self.rows[positions]
+        if len(rows) > n:
+            keep = np.argpartition(rows, n)[:n]
+            positions, rows = positions[keep], rows[keep]
+        first = np.argsort(rows, kind="stable")
+        sample = self.frame.take(positions[first])
+        sample.index = rows[first]
+        return sample
+
+    def head(self, n, year_range, manufacturers=None, fuel_types=None):
+        """First n matching rows (in year order)"""
+        positions = self.positions_for(year_range, manufacturers, fuel_types)
+        if isinstance(positions, slice):
+            return self.frame.iloc[positions.start : min(positions.stop, positions.start + n)]
+        return self.frame.take(positions[:n])
@@ -0,0 +1,204 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Latency bucket upper bounds in seconds (Prometheus style, roughly x2.5 apart)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: O(1) memory, mergeable, quantiles by bucket interpolation"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimated q-quantile (linear inside the bucket that holds it)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, n in zip(self.buckets, self.counts):
+            if n and seen + n >= rank:
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1000 * self.quantile(0.50),
+            "p95_ms": 1000 * self.quantile(0.95),
+            "max_ms": 1000 * self.max,
+        }
+
+
+class StageMetrics:
+    """Thread-safe latency histograms keyed by stage name"""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(seconds)
+
+    def summary(self):
+        """{stage: {count, mean_ms, p50_ms, p95_ms, max_ms}}"""
+        with self._lock:
+            return {stage: h.summary() for stage, h in sorted(self.histograms.items())}
+
+    def to_prometheus(self, metric="dashboard_stage_seconds"):
+        """Prometheus text exposition format"""
+        lines = [
+            f"# HELP {metric} Time spent in each dashboard stage.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for upper, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    le = "+Inf" if upper == float("inf") else repr(upper)
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {h.total}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+class RunTimer:
+    """
+    Times the stages of one script run.
+
+    span() records into this run and into every registry passed in (for the
+    dashboard: the session's metrics and the process-wide metrics).
+    """
+
+    def __init__(self, *registries):
+        self.registries = registries
+        self.stages = {}
+        self.started = time.time()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[stage] = self.stages.get(stage, 0.0) + elapsed
+            for registry in self.registries:
+                registry.observe(stage, elapsed)
+
+    def timed(self, stage, fn):
+        """Wrap fn so each call is recorded as `stage`"""
+        def wrapper(*args, **kwargs):
+            with self.span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def finish(self, stage="total"):
+        """Record the time since the timer was created as `stage`"""
+        elapsed = time.perf_counter() - self._start
+        self.stages[stage] = elapsed
+        for registry in self.registries:
+            registry.observe(stage, elapsed)
+        return elapsed
+
+    def append_jsonl(self, path, **extra):
+        """Append this run's stage timings as one JSON line"""
+        record = {
+            "time": self.started,
+            "stages_ms": {stage: 1000 * s for stage, s in self.stages.items()},
+            **extra,
+        }
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler for one thread.
+
+    A background thread looks at the target thread's current stack every
+    `interval` seconds and counts the functions it sees. Nothing is added to
+    the profiled code, so the overhead is the sampling thread only.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = 0
+        self.self_counts = Counter()  # innermost frame
+        self.total_counts = Counter()  # anywhere on the stack
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.self_counts[self._label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                label = self._label(frame)
+                if label not in seen:
+                    self.total_counts[label] += 1
+                    seen.add(label)
+                frame = frame.f_back
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def top(self, n=15):
+        """[(function, self %, total %)] for the functions with the most self samples"""
+        if not self.samples:
+            return []
+        return [
+            (label, 100 * count / self.samples, 100 * self.total_counts[label] / self.samples)
+            for label, count in self.self_counts.most_common(n)
+        ]
@@ -0,0 +1,229 @@
+import glob
+import io
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from car_data import CAR_SALES_DTYPES
+from filter_index import SalesFilterIndex
+from sales_cube import SalesCube
+
+
+class SalesTail:
+    """
+    Follow an append-only sales CSV, or a directory of them, and parse only new bytes.
+
+    A byte offset is kept per file. poll() reads from the offset up to the last
+    complete line, so a row that is still being written is picked up next time.
+    The header line of each file is skipped on its first read. replaced() tells
+    when a file was truncated, replaced or removed, so the offsets are no longer
+    valid.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offsets = {}  # file -> bytes already parsed
+        self.inodes = {}  # file -> (device, inode) the offset belongs to
+        self.columns = list(CAR_SALES_DTYPES)
+
+    def files(self):
+        if os.path.isdir(self.path):
+            return sorted(glob.glob(os.path.join(self.path, "*.csv")))
+        return [self.path]
+
+    def _read_new_bytes(self, file):
+        offset = self.offsets.get(file, 0)
+        if os.path.getsize(file) <= offset:
+            return b""
+        with open(file, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if offset and (stat.st_dev, stat.st_ino) != self.inodes[file]:
+                return b""  # swapped for another file since the last read; see replaced()
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # only complete lines
+        if end == 0:
+            return b""
+        data = data[:end]
+        if offset == 0:
+            # Skip the header line
+            data = data[data.find(b"\n") + 1 :]
+        self.offsets[file] = offset + end
+        self.inodes[file] = (stat.st_dev, stat.st_ino)
+        return data
+
+    def replaced(self):
+        """True when a file read before shrank below its offset, was replaced or was removed"""
+        for file, offset in self.offsets.items():
+            try:
+                stat = os.stat(file)
+            except FileNotFoundError:
+                return True
+            if stat.st_size < offset or (stat.st_dev, stat.st_ino) != self.inodes[file]:
+                return True
+        return False
+
+    def poll(self):
+        """New rows since the last poll (an empty frame when nothing was appended)"""
+        parts = []
+        for file in self.files():
+            data = self._read_new_bytes(file)
+            if data:
+                parts.append(
+                    pd.read_csv(io.BytesIO(data), header=None, names=self.columns, dtype=CAR_SALES_DTYPES)
+                )
+        if not parts:
+            return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in CAR_SALES_DTYPES.items()})
+        return concat_sales(parts)
+
+    def bytes_ingested(self):
+        return sum(self.offsets.values())
+
+
+def concat_sales(frames):
+    """
+    Concatenate sales frames and keep the categorical columns categorical.
+
+    pd.concat turns categoricals with different categories into object
+    columns, so the categories are unioned first.
+    """
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in CAR_SALES_DTYPES.items()})
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    columns = {}
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            columns[col] = union_categoricals([f[col] for f in frames])
+        else:
+            columns[col] = pd.concat([f[col] for f in frames], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def _code_dtype(categories):
+    """Integer type pandas uses for the codes of a categorical with this many categories"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class SalesColumns:
+    """
+    Column storage for a sales frame that only grows.
+
+    Each column is an array with spare room at the end (categoricals keep their
+    codes), so appending copies only the new rows; when an array is full it is
+    doubled. frame() wraps the filled part in a DataFrame without copying it.
+    Rows are never written twice, so frames handed out earlier stay valid.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.arrays = {}  # column -> values, or codes for a categorical column
+        self.categories = {}  # categorical column -> pd.Index
+
+    def append(self, df):
+        size = self.size + len(df)
+        for column in df.columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                known = self.categories.get(column, pd.Index([], dtype=values.cat.categories.dtype))
+                categories = known.append(values.cat.categories.difference(known))
+                self.categories[column] = categories
+                data = categories.get_indexer(values.cat.categories)[values.cat.codes.to_numpy()]
+                data[values.isna().to_numpy()] = -1
+                dtype = _code_dtype(len(categories))
+            else:
+                data = values.to_numpy()
+                dtype = data.dtype
+            array = self.arrays.get(column)
+            if array is None or len(array) < size or array.dtype != dtype:
+                grown = np.empty(max(size, 2 * len(array) if array is not None else size), dtype=dtype)
+                if array is not None:
+                    grown[: self.size] = array[: self.size]
+                array = self.arrays[column] = grown
+            array[self.size : size] = data
+        self.size = size
+
+    def frame(self):
+        columns = {}
+        for column, array in self.arrays.items():
+            if column in self.categories:
+                columns[column] = pd.Categorical.from_codes(
+                    array[: self.size], categories=self.categories[column], validate=False
+                )
+            else:
+                columns[column] = array[: self.size]
+        return pd.DataFrame(columns, copy=False)
+
+
+class LiveSalesData:
+    """
+    Cached sales frame and cube that grow as rows are appended to the source.
+
+    refresh() parses only the new byte range, appends the rows to the column
+    storage and folds them into the cube; the filter index merges them in the
+    next time it is asked for. A source file that was truncated or replaced is
+    read again from the start. It is safe to call from several Streamlit
+    sessions at once.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._load(SalesTail(path))
+
+    def _load(self, tail):
+        """Start over from offset 0 of every file"""
+        self.tail = tail
+        self.columns = SalesColumns()
+        rows = self.tail.poll()
+        self.columns.append(rows)
+        self.df = self.columns.frame()
+        self.cube = SalesCube.from_frame(self.df)
+        self._index = None
+        self.last_ingested = time.time()
+        self.last_batch_rows = len(rows)
+
+    def refresh(self):
+        """Ingest anything new; returns the number of new rows (all of them after a reload)"""
+        with self._lock:
+            if self.tail.replaced():
+                self._load(SalesTail(self.tail.path))
+                self.version += 1
+                return len(self.df)
+            new_rows = self.tail.poll()
+            if len(new_rows) == 0:
+                return 0
+            self.columns.append(new_rows)
+            self.df = self.columns.frame()
+            self.cube = self.cube.add_rows(new_rows)
+            self.last_ingested = time.time()
+            self.last_batch_rows = len(new_rows)
+            self.version += 1
+            return len(new_rows)
+
+    def filter_index(self):
+        """SalesFilterIndex over the current rows; rows added since the last call are merged in"""
+        with self._lock:
+            if self._index is None:
+                self._index = SalesFilterIndex(self.df)
+            elif len(self._index) < len(self.df):
+                self._index = self._index.add_rows(self.df.iloc[len(self._index) :])
+            return self._index
+
+    def watermark(self):
+        """Summary of what has been ingested so far, for display"""
+        return {
+            "rows": len(self.df),
+            "bytes": self.tail.bytes_ingested(),
+            "last_batch_rows": self.last_batch_rows,
+            "last_ingested": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.last_ingested)),
+            "version": self.version,
+        }
@@ -0,0 +1,111 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from car_data import read_car_sales_csv
+from streaming_eda import SalesReportAccumulator, print_report
+
+
+def list_shards(path):
+    """CSV shards in a directory (sorted, so the merged head is stable), or a single file"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.csv")))
+    return [path]
+
+
+def aggregate_shard(path, chunksize=100_000):
+    """Worker: partial report for one shard"""
+    acc = SalesReportAccumulator()
+    for chunk in read_car_sales_csv(path, chunksize=chunksize):
+        acc.update(chunk)
+    return acc
+
+
+def parallel_report(path, workers=None, chunksize=100_000):
+    """
+    Aggregate every shard in a process pool and merge the partial results.
+
+    Each worker returns a SalesReportAccumulator (counts, moment sums,
+    regression sums and quantile sketches), so only small objects travel back
+    to the parent. With workers=1 the shards are processed in this process.
+    """
+    shards = list_shards(path)
+    if not shards:
+        raise FileNotFoundError(f"No CSV shards found in {path}")
+
+    total = SalesReportAccumulator()
+    if workers == 1:
+        for shard in shards:
+            total.merge(aggregate_shard(shard, chunksize))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() keeps shard order, so the merged head matches a serial run
+        for partial in pool.map(aggregate_shard, shards, [chunksize] * len(shards)):
+            total.merge(partial)
+    return total
+
+
+def write_shards(source_csv, out_dir, shards=8, repeat=1):
+    """Split (and optionally repeat) a CSV into equal shards, for testing and benchmarks"""
+    os.makedirs(out_dir, exist_ok=True)
+    df = read_car_sales_csv(source_csv)
+    rows_per_shard = -(-len(df) // shards)
+    paths = []
+    for i in range(shards):
+        part = df.iloc[i * rows_per_shard : (i + 1) * rows_per_shard]
+        path = os.path.join(out_dir, f"car_sales_{i:03d}.csv")
+        with open(path, "w", newline="") as f:
+            for r in range(repeat):
+                part.to_csv(f, index=False, header=(r == 0))
+        paths.append(path)
+    return paths
+
+
+def benchmark(path, worker_counts, chunksize=100_000):
+    """Time parallel_report for each worker count and print the speedup over 1 worker"""
+    print(f"Shards: {len(list_shards(path))}")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        parallel_report(path, workers=workers, chunksize=chunksize)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Car sales report over a directory of CSV shards")
+    parser.add_argument("shards", help="directory of CSV shards (or a single CSV)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="rows per chunk")
+    parser.add_argument("--benchmark", action="store_true", help="time 1, 2, 4, ... workers")
+    parser.add_argument(
+        "--make-shards", metavar="SOURCE_CSV",
+        help="first split SOURCE_CSV into the shards directory",
+    )
+    parser.add_argument("--num-shards", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=1, help="copies of the source rows per shard")
+    args = parser.parse_args(argv)
+
+    if args.make_shards:
+        write_shards(args.make_shards, args.shards, args.num_shards, args.repeat)
+
+    if args.benchmark:
+        max_workers = args.workers or os.cpu_count()
+        counts = [1]
+        while counts[-1] * 2 <= max_workers:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != max_workers:
+            counts.append(max_workers)
+        benchmark(args.shards, counts, args.chunksize)
+    else:
+        print_report(parallel_report(args.shards, args.workers, args.chunksize))
+
+
+if __name__ == "__main__":
+    main()
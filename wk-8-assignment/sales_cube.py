@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from top_k import top_k_weighted
+
+# The cube is keyed on every column the dashboard filters or groups by
+CUBE_KEYS = ["Year of manufacture", "Manufacturer", "Model", "Fuel type"]
+
+
+class SalesCube:
+    """
+    Pre-aggregated car sales, one row per (year, manufacturer, model, fuel type).
+
+    Each cell keeps the count plus the sums, sums of squares and cross product
+    of Price and Mileage. That is enough to answer the dashboard's metrics,
+    yearly counts, top models, correlation and linear fit without touching the
+    raw rows, so a query costs the same for 50k or 50M sales.
+
+    Price and Mileage are shifted by their overall means before squaring, which
+    keeps the float64 sums accurate on very large tables. Correlation and slope
+    do not change under a shift; the means add the shift back.
+    """
+
+    def __init__(self, cells, price_shift, mileage_shift):
+        self.cells = cells
+        self.price_shift = price_shift
+        self.mileage_shift = mileage_shift
+
+    @classmethod
+    def from_frame(cls, df, price_shift=None, mileage_shift=None):
+        if price_shift is None:
+            price_shift = float(df["Price"].mean()) if len(df) else 0.0
+        if mileage_shift is None:
+            mileage_shift = float(df["Mileage"].mean()) if len(df) else 0.0
+
+        price = df["Price"].to_numpy(dtype=np.float64) - price_shift
+        mileage = df["Mileage"].to_numpy(dtype=np.float64) - mileage_shift
+
+        terms = pd.DataFrame(
+            {
+                "price_sum": price,
+                "price_sq": price * price,
+                "mileage_sum": mileage,
+                "mileage_sq": mileage * mileage,
+                "cross": price * mileage,
+            },
+            index=df.index,
+        )
+        for key in CUBE_KEYS:
+            terms[key] = df[key]
+
+        grouped = terms.groupby(CUBE_KEYS, observed=True, sort=False)
+        cells = grouped.sum()
+        cells.insert(0, "count", grouped.size())
+        cells = cells.reset_index()
+        return cls(cells, price_shift, mileage_shift)
+
+    def add_rows(self, df):
+        """
+        Return a cube that also counts the rows in df.
+
+        Only the new rows are aggregated; they use this cube's shifts so the
+        sums can simply be added cell by cell.
+        """
+        if len(df) == 0:
+            return self
+        new = SalesCube.from_frame(df, self.price_shift, self.mileage_shift)
+        cells = pd.concat([self.cells, new.cells], ignore_index=True)
+        cells = cells.groupby(CUBE_KEYS, observed=True, sort=False).sum().reset_index()
+        return SalesCube(cells, self.price_shift, self.mileage_shift)
+
+    def filter(self, year_range=None, manufacturers=None):
+        """Return a smaller cube holding only the matching cells"""
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        if year_range is not None:
+            years = cells["Year of manufacture"]
+            mask &= (years >= year_range[0]) & (years <= year_range[1])
+        if manufacturers:
+            mask &= cells["Manufacturer"].isin(manufacturers).to_numpy()
+        return SalesCube(cells[mask], self.price_shift, self.mileage_shift)
+
+    def _totals(self):
+        return self.cells[
+            ["count", "price_sum", "price_sq", "mileage_sum", "mileage_sq", "cross"]
+        ].sum()
+
+    def count(self):
+        return int(self.cells["count"].sum())
+
+    def mean_price(self):
+        t = self._totals()
+        return t["price_sum"] / t["count"] + self.price_shift if t["count"] else np.nan
+
+    def mean_mileage(self):
+        t = self._totals()
+        return t["mileage_sum"] / t["count"] + self.mileage_shift if t["count"] else np.nan
+
+    def yearly_counts(self):
+        """Same result as df['Year of manufacture'].value_counts().sort_index()"""
+        return self.cells.groupby("Year of manufacture")["count"].sum().sort_index()
+
+    def top_models(self, n=10, method="exact"):
+        """
+        Same result as df['Model'].value_counts().head(n).
+
+        method is one of top_k.TOP_K_METHODS; the sketches read the cube cells
+        directly instead of grouping them by model first.
+        """
+        if method != "exact":
+            return top_k_weighted(
+                self.cells["Model"], self.cells["count"], n, method, names=["Model"]
+            )
+        counts = self.cells.groupby("Model", observed=True)["count"].sum()
+        return counts[counts > 0].nlargest(n)
+
+    def _centred_moments(self):
+        t = self._totals()
+        n = t["count"]
+        sxx = t["mileage_sq"] - t["mileage_sum"] ** 2 / n
+        syy = t["price_sq"] - t["price_sum"] ** 2 / n
+        sxy = t["cross"] - t["mileage_sum"] * t["price_sum"] / n
+        return t, sxx, syy, sxy
+
+    def correlation(self):
+        """Pearson correlation of Price and Mileage"""
+        if self.count() < 2:
+            return np.nan
+        _, sxx, syy, sxy = self._centred_moments()
+        if sxx <= 0 or syy <= 0:
+            return np.nan
+        return sxy / np.sqrt(sxx * syy)
+
+    def linear_fit(self):
+        """Least squares Price = slope * Mileage + intercept, like np.polyfit(x, y, 1)"""
+        if self.count() < 2:
+            return np.nan, np.nan
+        t, sxx, _, sxy = self._centred_moments()
+        if sxx <= 0:
+            return np.nan, np.nan
+        slope = sxy / sxx
+        mean_x = t["mileage_sum"] / t["count"] + self.mileage_shift
+        mean_y = t["price_sum"] / t["count"] + self.price_shift
+        return slope, mean_y - slope * mean_x
@@ -0,0 +1,341 @@
+import argparse
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from car_data import read_car_sales_csv
+
+NUMERIC_COLUMNS = ["Engine size", "Year of manufacture", "Mileage", "Price"]
+CATEGORICAL_COLUMNS = ["Manufacturer", "Model", "Fuel type"]
+
+
+class RunningStats:
+    """Count, mean, variance (Welford), min and max of a numeric column, mergeable"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        other = RunningStats()
+        other.n = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other):
+        """Chan et al. pairwise combination of two partial results"""
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def std(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+
+class CoMoments:
+    """Running means and co-moments of two columns, enough for corr and a linear fit"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.syy = 0.0
+        self.sxy = 0.0
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        keep = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[keep], y[keep]
+        if len(x) == 0:
+            return
+        other = CoMoments()
+        other.n = len(x)
+        other.mean_x = float(x.mean())
+        other.mean_y = float(y.mean())
+        dx = x - other.mean_x
+        dy = y - other.mean_y
+        other.sxx = float((dx * dx).sum())
+        other.syy = float((dy * dy).sum())
+        other.sxy = float((dx * dy).sum())
+        self.merge(other)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.sxx += other.sxx + dx * dx * weight
+        self.syy += other.syy + dy * dy * weight
+        self.sxy += other.sxy + dx * dy * weight
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.n = n
+
+    def correlation(self):
+        if self.n < 2 or self.sxx <= 0 or self.syy <= 0:
+            return np.nan
+        return self.sxy / np.sqrt(self.sxx * self.syy)
+
+    def linear_fit(self):
+        """(slope, intercept) of y on x, same as np.polyfit(x, y, 1)"""
+        if self.n < 2 or self.sxx <= 0:
+            return np.nan, np.nan
+        slope = self.sxy / self.sxx
+        return slope, self.mean_y - slope * self.mean_x
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang & Liberty).
+
+    Values are kept in levels; an item on level h stands for 2**h original
+    values. When a level is full it is sorted and every other item is promoted
+    to the next level. Memory stays around 3k items whatever the input size
+    and the rank error is roughly 1.7 / k.
+    """
+
+    def __init__(self, k=400, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                leftover = items[len(items) - len(items) % 2 :]
+                items = items[: len(items) - len(items) % 2]
+                promoted = items[self._rng.integers(2) :: 2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def quantile(self, q):
+        """Approximate quantile(s) for q in [0, 1], like Series.quantile"""
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        weights = np.concatenate(
+            [np.full(len(items_at), 2.0**level) for level, items_at in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, targets, side="left"), len(items) - 1)
+        return items[idx]
+
+
+class SalesReportAccumulator:
+    """
+    Everything Frameworks_Assignment.py prints, collected from chunks in one pass.
+
+    update() takes one DataFrame chunk; merge() combines two accumulators built
+    over different parts of the data. Memory depends on the number of distinct
+    years / models, not on the number of rows.
+    """
+
+    def __init__(self, head_rows=5, sketch_k=400):
+        self.rows = 0
+        self.head = None
+        self.head_rows = head_rows
+        self.columns = None
+        self.dtypes = None
+        self.nulls = Counter()
+        self.stats = {col: RunningStats() for col in NUMERIC_COLUMNS}
+        self.sketches = {col: KLLSketch(sketch_k) for col in NUMERIC_COLUMNS}
+        self.category_counts = {col: Counter() for col in CATEGORICAL_COLUMNS}
+        self.year_counts = Counter()
+        self.model_counts = Counter()
+        self.price_mileage = CoMoments()
+
+    def update(self, chunk):
+        if self.head is None:
+            self.head = chunk.head(self.head_rows)
+            self.columns = chunk.columns.tolist()
+            self.dtypes = chunk.dtypes
+        elif len(self.head) < self.head_rows:
+            self.head = pd.concat([self.head, chunk.head(self.head_rows - len(self.head))])
+
+        self.rows += len(chunk)
+        self.nulls.update(chunk.isnull().sum().to_dict())
+
+        for col in NUMERIC_COLUMNS:
+            values = chunk[col].to_numpy(dtype=np.float64)
+            self.stats[col].update(values)
+            self.sketches[col].update(values)
+
+        for col in CATEGORICAL_COLUMNS:
+            self.category_counts[col].update(chunk[col].value_counts(sort=False).to_dict())
+
+        self.year_counts.update(chunk["Year of manufacture"].value_counts(sort=False).to_dict())
+        pairs = chunk.groupby(["Manufacturer", "Model"], observed=True).size()
+        self.model_counts.update(pairs.to_dict())
+
+        self.price_mileage.update(chunk["Mileage"], chunk["Price"])
+
+    def merge(self, other):
+        if other.head is not None:
+            if self.head is None:
+                self.head, self.columns, self.dtypes = other.head, other.columns, other.dtypes
+            elif len(self.head) < self.head_rows:
+                self.head = pd.concat([self.head, other.head.head(self.head_rows - len(self.head))])
+        self.rows += other.rows
+        self.nulls.update(other.nulls)
+        for col in NUMERIC_COLUMNS:
+            self.stats[col].merge(other.stats[col])
+            self.sketches[col].merge(other.sketches[col])
+        for col in CATEGORICAL_COLUMNS:
+            self.category_counts[col].update(other.category_counts[col])
+        self.year_counts.update(other.year_counts)
+        self.model_counts.update(other.model_counts)
+        self.price_mileage.merge(other.price_mileage)
+
+    # ---- results, shaped like the pandas calls in Frameworks_Assignment.py ----
+
+    def describe(self):
+        """Approximate df.describe(include='number'); quartiles come from the sketch"""
+        result = {}
+        for col in NUMERIC_COLUMNS:
+            s = self.stats[col]
+            q25, q50, q75 = self.sketches[col].quantile([0.25, 0.5, 0.75])
+            result[col] = [s.n, s.mean, s.std(), s.min, q25, q50, q75, s.max]
+        index = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+        return pd.DataFrame(result, index=index)
+
+    def describe_categorical(self):
+        """Same as df.describe(include=['object', 'category'])"""
+        result = {}
+        for col in CATEGORICAL_COLUMNS:
+            counts = self.category_counts[col]
+            top, freq = counts.most_common(1)[0] if counts else (np.nan, np.nan)
+            result[col] = [sum(counts.values()), len(counts), top, freq]
+        return pd.DataFrame(result, index=["count", "unique", "top", "freq"])
+
+    def missing_values(self):
+        return pd.Series({col: self.nulls.get(col, 0) for col in self.columns})
+
+    def yearly_counts(self):
+        counts = pd.Series(self.year_counts, name="count").sort_index()
+        counts.index.name = "Year of manufacture"
+        return counts
+
+    def top_models(self, n=10):
+        top = self.model_counts.most_common(n)
+        index = pd.MultiIndex.from_tuples([pair for pair, _ in top], names=["Manufacturer", "Model"])
+        return pd.Series([count for _, count in top], index=index)
+
+
+def stream_report(path="car_sales_data.csv", chunksize=100_000):
+    """Build the report accumulator with one pass over the CSV"""
+    acc = SalesReportAccumulator()
+    for chunk in read_car_sales_csv(path, chunksize=chunksize):
+        acc.update(chunk)
+    return acc
+
+
+def print_report(acc):
+    """Print the same sections as Frameworks_Assignment.py"""
+    print(acc.head)
+
+    print("\nBasic Statistics:")
+    print(acc.describe())
+
+    print("\nDataFrame Info:")
+    print(f"RangeIndex: {acc.rows} entries, 0 to {acc.rows - 1}")
+    print(f"Data columns (total {len(acc.columns)} columns):")
+    for col in acc.columns:
+        print(f"  {col:<20} {acc.rows - acc.nulls.get(col, 0)} non-null  {acc.dtypes[col]}")
+
+    print("\nColumn Names:")
+    print(acc.columns)
+
+    print("\n=== DataFrame Dimensions ===")
+    print(f"Number of rows: {acc.rows}")
+    print(f"Number of columns: {len(acc.columns)}")
+
+    print("\n=== Data Types ===")
+    print(acc.dtypes)
+
+    print("\n=== Basic Statistics for numeric columns")
+    print(acc.describe())
+
+    print("\nSummary for categorical columns")
+    print(acc.describe_categorical())
+
+    print("\n=== Missing Values ===")
+    missing_values = acc.missing_values()
+    print("Missing values per column:")
+    print(missing_values[missing_values > 0] if missing_values.sum() > 0 else "No missing values found in any column")
+
+    print("\n=== Number of Cars by Year of Manufacture ===")
+    print(acc.yearly_counts())
+
+    print("\n=== Years with Most Cars (Descending Order) ===")
+    print(acc.yearly_counts().sort_values(ascending=False))
+
+    print("\n=== Top 10 Best Selling Car Models (with Manufacturer) ===")
+    print(acc.top_models(10))
+
+    slope, intercept = acc.price_mileage.linear_fit()
+    print(f"\nTrendline: Price = {slope:.4f} * Mileage + {intercept:.2f}")
+    print(f"\nCorrelation between Price and Mileage: {acc.price_mileage.correlation():.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="One-pass chunked report over a car sales CSV")
+    parser.add_argument("csv", nargs="?", default="car_sales_data.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="rows per chunk")
+    args = parser.parse_args(argv)
+    print_report(stream_report(args.csv, args.chunksize))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,16 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+
+from car_data import data_version, load_car_sales
+from chart_cache import ChartCache, chart_key
+from charts import RENDER_MODES, plot_price_vs_mileage
+from duckdb_store import SalesStore
+from filter_index import SalesFilterIndex
+from instrumentation import RunTimer, SamplingProfiler, StageMetrics
+from live_ingest import LiveSalesData
+from sales_cube import SalesCube
+from top_k import TOP_K_METHODS
 
 # Set page configuration
 st.set_page_config(page_title="Car Sales Analysis", page_icon="🚗", layout="wide")
@@ -10,131 +19,301 @@ st.set_page_config(page_title="Car Sales Analysis", page_icon="🚗", layout="wi
 # Load the data
 @st.cache_data  # This will cache the data to avoid reloading it on every interaction
 def load_data():
-    return pd.read_csv("car_sales_data.csv")
+    return load_car_sales("car_sales_data.csv")
+
+
+@st.cache_data  # Aggregate once, then every filter change is answered from the cube
+def load_cube():
+    return SalesCube.from_frame(load_data())
+
+
+@st.cache_resource  # One DuckDB connection over the Parquet copy, shared by every session
+def get_sales_store(path, version):
+    return SalesStore.from_csv(path, memory_limit=os.environ.get("DASHBOARD_DUCKDB_MEMORY"))
+
+
+@st.cache_resource(max_entries=2)  # Built once per data version; `_df` is not hashed
+def get_filter_index(version, _df):
+    return SalesFilterIndex(_df)
+
+
+@st.cache_resource  # One shared, growing copy for every session
+def get_live_data(path):
+    return LiveSalesData(path)
+
+
+@st.cache_resource  # Rendered PNGs are shared by every session
+def get_chart_cache():
+    return ChartCache(
+        max_entries=int(os.environ.get("CHART_CACHE_ENTRIES", 256)),
+        ttl_seconds=float(os.environ["CHART_CACHE_TTL"]) if "CHART_CACHE_TTL" in os.environ else None,
+        disk_dir=os.environ.get("CHART_CACHE_DIR"),  # optional on-disk copy
+    )
+
 
+@st.cache_resource  # Stage latencies aggregated over every session
+def get_global_metrics():
+    return StageMetrics()
 
-df = load_data()
 
-# Title and description
-st.title("🚗 Car Sales Analysis Dashboard")
-st.markdown(
-    """
+chart_cache = get_chart_cache()
+
+# Time each stage of this run, per session and across all sessions
+if "stage_metrics" not in st.session_state:
+    st.session_state["stage_metrics"] = StageMetrics()
+timer = RunTimer(st.session_state["stage_metrics"], get_global_metrics())
+
+# The profiler toggle lives in the debug panel at the bottom of the sidebar
+profiler = SamplingProfiler().start() if st.session_state.get("profile_run") else None
+
+# The page body runs under try/finally: st.stop(), a rerun or an error must not
+# leave the profiler thread sampling (one more would be started on every rerun)
+try:
+    # DASHBOARD_BACKEND=duckdb keeps the sales on disk (Parquet) and runs every
+    # filter and aggregation in DuckDB, for histories that do not fit in memory
+    backend = os.environ.get("DASHBOARD_BACKEND", "pandas")
+    store = None
+
+    # Live mode follows an append-only file or folder and only parses new rows
+    st.sidebar.header("Data Source")
+    live_mode = backend == "pandas" and st.sidebar.checkbox("Live mode (follow appended sales)")
+    if live_mode:
+        live_path = st.sidebar.text_input("Sales file or folder", "car_sales_data.csv")
+        live = get_live_data(live_path)
+        if st.sidebar.button("Check for new sales"):
+            pass  # the click reruns the script, which refreshes below
+        with timer.span("load"):
+            live.refresh()
+            df, cube = live.df, live.cube
+            watermark = live.watermark()
+        version = f"live:{os.path.abspath(live_path)}:{watermark['version']}:{watermark['bytes']}"
+        st.sidebar.caption(
+            f"Last ingested: {watermark['last_ingested']} "
+            f"({watermark['last_batch_rows']:,} new rows, {watermark['rows']:,} total)"
+        )
+    elif backend == "duckdb":
+        with timer.span("load"):
+            version = data_version("car_sales_data.csv")
+            store = get_sales_store("car_sales_data.csv", version)
+        st.sidebar.caption("Out-of-core backend: DuckDB over Parquet")
+    else:
+        with timer.span("load"):
+            df = load_data()
+            cube = load_cube()
+            version = data_version("car_sales_data.csv")
+
+    def filter_index():
+        """Year-sorted row index for the row-level views (live mode merges new rows into its own)"""
+        return live.filter_index() if live_mode else get_filter_index(version, df)
+
+    # Slider bounds and manufacturer options (the DuckDB store answers with small queries)
+    if store is not None:
+        year_bounds = store.year_bounds()
+        manufacturer_options = store.manufacturers()
+    else:
+        year_bounds = (int(df["Year of manufacture"].min()), int(df["Year of manufacture"].max()))
+        manufacturer_options = df["Manufacturer"].unique().tolist()
+
+    # Title and description
+    st.title("🚗 Car Sales Analysis Dashboard")
+    st.markdown(
+        """
 This interactive dashboard helps you explore car sales data. Use the filters on the sidebar to analyze different aspects of the data.
 """
-)
-
-# Sidebar filters
-st.sidebar.header("Filters")
-
-# Year range slider
-year_range = st.sidebar.slider(
-    "Select Year Range",
-    min_value=int(df["Year of manufacture"].min()),
-    max_value=int(df["Year of manufacture"].max()),
-    value=(2000, 2022),
-)
-
-# Manufacturer multiselect
-manufacturers = st.sidebar.multiselect(
-    "Select Manufacturers",
-    options=df["Manufacturer"].unique(),
-    default=df["Manufacturer"].unique(),
-)
-
-# Apply filters
-filtered_df = df[
-    (df["Year of manufacture"] >= year_range[0])
-    & (df["Year of manufacture"] <= year_range[1])
-    & (df["Manufacturer"].isin(manufacturers) if manufacturers else True)
-]
-
-# Show data summary
-st.subheader("Data Overview")
-col1, col2, col3 = st.columns(3)
-col1.metric("Total Cars", len(filtered_df))
-col2.metric("Average Price", f"${filtered_df['Price'].mean():,.0f}")
-col3.metric("Average Mileage", f"{filtered_df['Mileage'].mean():,.0f} miles")
-
-# Show sample data
-expander = st.expander("View Sample Data")
-with expander:
-    st.dataframe(filtered_df.head(10))
-
-# Create tabs for different visualizations
-tab1, tab2, tab3 = st.tabs(["Sales Over Time", "Price Analysis", "Top Models"])
-
-with tab1:
-    st.subheader("Car Sales by Year")
-    yearly_sales = filtered_df["Year of manufacture"].value_counts().sort_index()
-
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.bar(yearly_sales.index, yearly_sales.values, color="skyblue")
-    ax.set_title("Number of Cars Sold by Year")
-    ax.set_xlabel("Year")
-    ax.set_ylabel("Number of Cars Sold")
-    ax.grid(True, linestyle="--", alpha=0.6)
-    st.pyplot(fig)
-
-with tab2:
-    st.subheader("Price Analysis")
-
-    # Scatter plot
-    fig, ax = plt.subplots(figsize=(10, 5))
-    scatter = ax.scatter(
-        x=filtered_df["Mileage"],
-        y=filtered_df["Price"],
-        c=filtered_df["Engine size"],
-        cmap="viridis",
-        alpha=0.6,
-        s=20,
     )
 
-    # Add trendline
-    z = np.polyfit(filtered_df["Mileage"], filtered_df["Price"], 1)
-    p = np.poly1d(z)
-    ax.plot(filtered_df["Mileage"], p(filtered_df["Mileage"]), "r--", linewidth=2)
-
-    # Customize plot
-    plt.colorbar(scatter, label="Engine Size (L)")
-    ax.set_title("Price vs Mileage (Colored by Engine Size)")
-    ax.set_xlabel("Mileage (miles)")
-    ax.set_ylabel("Price ($)")
-    ax.grid(True, linestyle="--", alpha=0.6)
-    st.pyplot(fig)
-
-    # Show correlation
-    correlation = filtered_df["Price"].corr(filtered_df["Mileage"])
-    st.metric("Correlation between Price and Mileage", f"{correlation:.2f}")
-
-with tab3:
-    st.subheader("Top Selling Models")
-
-    # Get top 10 models
-    top_models = filtered_df["Model"].value_counts().head(10).sort_values()
-
-    # Create horizontal bar chart
-    fig, ax = plt.subplots(figsize=(10, 6))
-    colors = plt.cm.viridis(np.linspace(0.2, 0.9, len(top_models)))
-    bars = ax.barh(top_models.index, top_models.values, color=colors, height=0.7)
-
-    # Add data labels
-    for bar in bars:
-        width = bar.get_width()
-        ax.text(
-            width + 0.5,
-            bar.get_y() + bar.get_height() / 2,
-            f"{int(width)}",
-            va="center",
-            fontsize=9,
+    # Sidebar filters
+    st.sidebar.header("Filters")
+
+    # Year range slider
+    year_range = st.sidebar.slider(
+        "Select Year Range",
+        min_value=year_bounds[0],
+        max_value=year_bounds[1],
+        value=(2000, 2022),
+    )
+
+    # Manufacturer multiselect
+    manufacturers = st.sidebar.multiselect(
+        "Select Manufacturers",
+        options=manufacturer_options,
+        default=manufacturer_options,
+    )
+
+    # Apply filters to the pre-aggregated cube (cost does not grow with row count),
+    # or to the DuckDB store (same query methods, evaluated in the engine)
+    with timer.span("filter"):
+        filtered_cube = (store or cube).filter(year_range, manufacturers)
+
+    # Charts are cached by (chart, data version, filter state)
+    filter_state = {"year_range": year_range, "manufacturers": manufacturers}
+    all_choices = {"manufacturers": manufacturer_options}  # none selected filters like all selected
+
+    # Show data summary
+    st.subheader("Data Overview")
+    with timer.span("aggregate"):
+        total_cars = filtered_cube.count()
+        average_price = filtered_cube.mean_price()
+        average_mileage = filtered_cube.mean_mileage()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Cars", total_cars)
+    col2.metric("Average Price", f"${average_price:,.0f}")
+    col3.metric("Average Mileage", f"{average_mileage:,.0f} miles")
+
+    # Show sample data
+    expander = st.expander("View Sample Data")
+    with expander:
+        with timer.span("sample_rows"):
+            if store is not None:
+                sample = filtered_cube.sample_rows(10)
+            else:
+                sample = filter_index().first_rows(10, year_range, manufacturers)  # no scan of the table
+        st.dataframe(sample)
+
+    # Create tabs for different visualizations
+    tab1, tab2, tab3 = st.tabs(["Sales Over Time", "Price Analysis", "Top Models"])
+
+    with tab1:
+        st.subheader("Car Sales by Year")
+
+        def yearly_sales_figure():
+            # matplotlib is only imported when a chart is not in the cache
+            import matplotlib.pyplot as plt
+
+            yearly_sales = filtered_cube.yearly_counts()
+
+            fig, ax = plt.subplots(figsize=(10, 5))
+            ax.bar(yearly_sales.index, yearly_sales.values, color="skyblue")
+            ax.set_title("Number of Cars Sold by Year")
+            ax.set_xlabel("Year")
+            ax.set_ylabel("Number of Cars Sold")
+            ax.grid(True, linestyle="--", alpha=0.6)
+            return fig
+
+        key = chart_key("yearly_sales", version, all_choices=all_choices, **filter_state)
+        with timer.span("chart:yearly_sales"):  # cache lookup, plus figure + PNG on a miss
+            png = chart_cache.get_or_render(key, timer.timed("figure:yearly_sales", yearly_sales_figure))
+        with timer.span("display:yearly_sales"):
+            st.image(png)
+
+    with tab2:
+        st.subheader("Price Analysis")
+
+        # Scatter plot (switches to a density view for large selections)
+        render_mode = st.radio("Chart type", RENDER_MODES, horizontal=True)
+
+        def price_figure():
+            import matplotlib.pyplot as plt
+
+            # The scatter needs the individual rows: a year slice of the sorted
+            # index, narrowed by the per-manufacturer row ids, or at most
+            # 200k sampled rows from DuckDB
+            if store is not None:
+                filtered_df = filtered_cube.scatter_rows()
+            else:
+                filtered_df = filter_index().query(year_range, manufacturers)
+
+            fig, ax = plt.subplots(figsize=(10, 5))
+            scatter = plot_price_vs_mileage(
+                ax,
+                filtered_df["Mileage"],
+                filtered_df["Price"],
+                filtered_df["Engine size"],
+                fit=filtered_cube.linear_fit(),  # fit comes from the cube sums
+                mode=render_mode,
+            )
+
+            # Customize plot
+            plt.colorbar(scatter, label="Engine Size (L)")
+            ax.set_title("Price vs Mileage (Colored by Engine Size)")
+            ax.set_xlabel("Mileage (miles)")
+            ax.set_ylabel("Price ($)")
+            ax.grid(True, linestyle="--", alpha=0.6)
+            return fig
+
+        key = chart_key(
+            "price_vs_mileage", version, all_choices=all_choices, render_mode=render_mode, **filter_state
+        )
+        with timer.span("chart:price_vs_mileage"):  # cache lookup, plus figure + PNG on a miss
+            png = chart_cache.get_or_render(key, timer.timed("figure:price_vs_mileage", price_figure))
+        with timer.span("display:price_vs_mileage"):
+            st.image(png)
+
+        # Show correlation
+        with timer.span("aggregate:correlation"):
+            correlation = filtered_cube.correlation()
+        st.metric("Correlation between Price and Mileage", f"{correlation:.2f}")
+
+    with tab3:
+        st.subheader("Top Selling Models")
+
+        # Top 10 models (exact, or one of the bounded-memory sketches)
+        top_k_method = st.selectbox("Counting method", TOP_K_METHODS)
+
+        def top_models_figure():
+            import matplotlib.pyplot as plt
+            import numpy as np
+
+            top_models = filtered_cube.top_models(10, method=top_k_method).sort_values()
+
+            # Create horizontal bar chart
+            fig, ax = plt.subplots(figsize=(10, 6))
+            colors = plt.cm.viridis(np.linspace(0.2, 0.9, len(top_models)))
+            bars = ax.barh(top_models.index, top_models.values, color=colors, height=0.7)
+
+            # Add data labels
+            for bar in bars:
+                width = bar.get_width()
+                ax.text(
+                    width + 0.5,
+                    bar.get_y() + bar.get_height() / 2,
+                    f"{int(width)}",
+                    va="center",
+                    fontsize=9,
+                )
+
+            # Customize plot
+            ax.set_title("Top 10 Best-Selling Car Models")
+            ax.set_xlabel("Number of Cars Sold")
+            ax.set_ylabel("Car Model")
+            ax.grid(axis="x", linestyle="--", alpha=0.6)
+            return fig
+
+        key = chart_key("top_models", version, all_choices=all_choices, method=top_k_method, **filter_state)
+        with timer.span("chart:top_models"):  # cache lookup, plus figure + PNG on a miss
+            png = chart_cache.get_or_render(key, timer.timed("figure:top_models", top_models_figure))
+        with timer.span("display:top_models"):
+            st.image(png)
+
+    # Chart cache counters for operators
+    with st.sidebar.expander("Chart cache"):
+        st.json(chart_cache.stats())
+
+    # Stage timings, written out when DASHBOARD_METRICS_JSONL / DASHBOARD_METRICS_PROM are set
+    timer.finish()
+    if os.environ.get("DASHBOARD_METRICS_JSONL"):
+        timer.append_jsonl(
+            os.environ["DASHBOARD_METRICS_JSONL"], backend=backend, live=live_mode, filters=filter_state
         )
+    if os.environ.get("DASHBOARD_METRICS_PROM"):
+        get_global_metrics().write_prometheus(os.environ["DASHBOARD_METRICS_PROM"])
 
-    # Customize plot
-    ax.set_title("Top 10 Best-Selling Car Models")
-    ax.set_xlabel("Number of Cars Sold")
-    ax.set_ylabel("Car Model")
-    ax.grid(axis="x", linestyle="--", alpha=0.6)
-    st.pyplot(fig)
+    with st.sidebar.expander("Performance debug"):
+        st.checkbox("Sampling profiler (applies from the next run)", key="profile_run")
+        st.caption("This run (ms)")
+        st.json({stage: round(1000 * seconds, 2) for stage, seconds in timer.stages.items()})
+        st.caption("This session")
+        st.dataframe([{"stage": stage, **numbers} for stage, numbers in st.session_state["stage_metrics"].summary().items()])
+        st.caption("All sessions")
+        st.dataframe([{"stage": stage, **numbers} for stage, numbers in get_global_metrics().summary().items()])
+        if profiler is not None:
+            profiler.stop()
+            st.caption(f"Profile of this run ({profiler.samples} samples)")
+            st.dataframe([{"function": f, "self %": s, "total %": t} for f, s, t in profiler.top()])
 
-# Add some space at the bottom
-st.markdown("---")
-st.markdown("*Data Analysis Dashboard created with Streamlit*")
+    # Add some space at the bottom
+    st.markdown("---")
+    st.markdown("*Data Analysis Dashboard created with Streamlit*")
+finally:
+    if profiler is not None:
+        profiler.stop()
@@ -0,0 +1,218 @@
+import heapq
+from collections import Counter
+from itertools import count as _sequence
+
+import numpy as np
+import pandas as pd
+
+TOP_K_METHODS = ("exact", "space_saving", "count_min")
+
+
+def _aggregate(items, weights=None):
+    """
+    (distinct items, summed weights) of a batch, so the counters below loop
+    over distinct values instead of every row. Items may be tuples.
+    """
+    if weights is None:
+        counts = Counter(items)  # counted in C
+        return list(counts), np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    items = list(items)
+    if not items:
+        return [], np.zeros(0, dtype=np.int64)
+    index = pd.Index(items, tupleize_cols=True)
+    counts = pd.Series(np.asarray(weights, dtype=np.int64), index=index)
+    counts = counts.groupby(level=list(range(index.nlevels)), sort=False, dropna=False).sum()
+    return counts.index.tolist(), counts.to_numpy()
+
+
+class ExactTopK:
+    """Exact counts in a Counter - the reference the sketches are compared against"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+
+    def update(self, items, weights=None):
+        if weights is None:
+            items = list(items)
+            self.counts.update(items)  # counted in C
+            self.total += len(items)
+            return
+        items, weights = _aggregate(items, weights)
+        counts = self.counts
+        for item, weight in zip(items, weights.tolist()):
+            counts[item] += weight
+        self.total += int(weights.sum())
+
+    def top(self, n=10):
+        return heapq.nlargest(n, self.counts.items(), key=lambda pair: pair[1])
+
+    def error_bound(self):
+        return 0
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters (Metwally, Agrawal & El Abbadi), weighted version.
+
+    Keeps at most `capacity` counters. A new item that finds the table full
+    replaces the smallest counter and inherits its count as error. Guarantees:
+      - every reported count overestimates the true count by at most total / capacity
+      - every item whose true count is above total / capacity is in the table
+    So with capacity >> k the top k is exact whenever the k-th item is above that bound.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}  # item -> [count, error]
+        self.total = 0
+        self._heap = []  # (count, sequence, item), stale entries are skipped
+        self._sequence = _sequence()
+
+    def _push(self, item, count):
+        heapq.heappush(self._heap, (count, next(self._sequence), item))
+        if len(self._heap) > 4 * self.capacity:
+            # Drop stale entries so the heap does not grow without bound
+            self._heap = [(c, next(self._sequence), i) for i, (c, _) in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, _, item = heapq.heappop(self._heap)
+            if item in self.counts and self.counts[item][0] == count:
+                return item, count
+
+    def update(self, items, weights=None):
+        # One step per distinct item of the batch, heaviest first (they are
+        # the likeliest to stay in the table)
+        items, weights = _aggregate(items, weights)
+        order = np.argsort(-weights, kind="stable")
+        self.total += int(weights.sum())
+        for item, weight in zip([items[i] for i in order], weights[order].tolist()):
+            entry = self.counts.get(item)
+            if entry is not None:
+                entry[0] += weight
+            elif len(self.counts) < self.capacity:
+                entry = self.counts[item] = [weight, 0]
+            else:
+                evicted, min_count = self._pop_min()
+                del self.counts[evicted]
+                entry = self.counts[item] = [min_count + weight, min_count]
+            self._push(item, entry[0])
+
+    def top(self, n=10):
+        return heapq.nlargest(
+            n, ((item, entry[0]) for item, entry in self.counts.items()), key=lambda pair: pair[1]
+        )
+
+    def error_bound(self):
+        """Maximum overestimate of any reported count"""
+        return self.total / self.capacity
+
+
+def _stable_hashes(items, hash_key):
+    """64-bit hashes that are the same in every process (Python's hash() is salted)"""
+    keys = np.array(["\x1f".join(map(str, i)) if isinstance(i, tuple) else str(i) for i in items], dtype=object)
+    return pd.util.hash_array(keys, hash_key=hash_key)
+
+
+class CountMinTopK:
+    """
+    Count-Min sketch plus a heap of the current top candidates.
+
+    The sketch is a depth x width table of counters. An item's estimate is the
+    minimum over its depth counters, which overestimates the true count by at
+    most e / width * total with probability 1 - exp(-depth). Only the `capacity`
+    best candidates seen so far are remembered by name.
+    """
+
+    def __init__(self, width=2048, depth=5, capacity=100):
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.candidates = {}  # item -> estimated count
+
+    def _columns(self, items):
+        h1 = _stable_hashes(items, "0123456789123456")
+        h2 = _stable_hashes(items, "6543210987654321") | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def update(self, items, weights=None):
+        items = list(items)
+        if not items:
+            return
+        weights = np.ones(len(items), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        cols = self._columns(items)
+        for row in range(self.depth):
+            np.add.at(self.table[row], cols[row], weights)
+        self.total += int(weights.sum())
+
+        estimates = self.table[np.arange(self.depth)[:, None], cols].min(axis=0)
+        for item, estimate in zip(items, estimates):
+            self.candidates[item] = int(estimate)
+        if len(self.candidates) > self.capacity:
+            keep = heapq.nlargest(self.capacity, self.candidates.items(), key=lambda pair: pair[1])
+            self.candidates = dict(keep)
+
+    def estimate(self, item):
+        cols = self._columns([item])
+        return int(self.table[np.arange(self.depth), cols[:, 0]].min())
+
+    def top(self, n=10):
+        return heapq.nlargest(n, self.candidates.items(), key=lambda pair: pair[1])
+
+    def error_bound(self):
+        """Overestimate bound that holds with probability 1 - exp(-depth)"""
+        return np.e / self.width * self.total
+
+
+def make_top_k(method="exact", capacity=1000):
+    """Create an incremental top-K counter; call .update() as rows arrive and .top(n) to read"""
+    if method == "exact":
+        return ExactTopK()
+    if method == "space_saving":
+        return SpaceSaving(capacity)
+    if method == "count_min":
+        return CountMinTopK(capacity=capacity)
+    raise ValueError(f"Unknown top-K method {method!r}, use one of {TOP_K_METHODS}")
+
+
+def _as_series(pairs, names):
+    if names and len(names) > 1:
+        index = pd.MultiIndex.from_tuples([item for item, _ in pairs], names=names)
+    else:
+        index = pd.Index([item for item, _ in pairs], name=names[0] if names else None)
+    return pd.Series([c for _, c in pairs], index=index, name="count")
+
+
+def top_k_counts(data, n=10, method="exact", capacity=1000, chunk_size=1_000_000):
+    """
+    The n most frequent values of a Series (or rows of a DataFrame), like
+    data.value_counts().head(n) but without sorting the whole count table.
+
+    "exact" counts everything and selects the top n with a partial sort.
+    "space_saving" and "count_min" read the data in chunks and only keep
+    bounded state between chunks (see the classes above).
+    """
+    names = data.columns.tolist() if isinstance(data, pd.DataFrame) else [data.name]
+    if method == "exact":
+        counts = data.value_counts(sort=False)
+        return counts[counts > 0].nlargest(n)
+
+    counter = make_top_k(method, capacity)
+    for start in range(0, len(data), chunk_size):
+        # One weighted update per distinct value in the chunk
+        counts = data.iloc[start : start + chunk_size].value_counts(sort=False)
+        counts = counts[counts > 0]
+        counter.update(counts.index.tolist(), counts.to_numpy())
+    return _as_series(counter.top(n), names)
+
+
+def top_k_weighted(items, weights, n=10, method="exact", capacity=1000, names=None):
+    """Top n of already aggregated (item, count) pairs, e.g. the cells of a SalesCube"""
+    counter = make_top_k(method, capacity)
+    counter.update(list(items), np.asarray(weights))
+    return _as_series(counter.top(n), names)
@@ -0,0 +1,364 @@
+#Word count for many files at once, spread over a process pool
+#Takes files, globs and directories, counts the words (as str.split() would)
+#in every file and merges them into one word frequency table. Big files are
+#cut into byte ranges so several workers share them; small files are packed
+#into batches so thousands of them do not mean thousands of round trips.
+#Missing or unreadable files are reported and skipped, the run carries on.
+#With --output-dir every file is also written uppercased, like week 4 did.
+#
+#    python word_count.py "logs/**/*.log" notes/ input.txt --top 20
+#    python word_count.py big.log --output-dir upper/ --ignore-case
+#----------------------------------------------------------------------------------
+
+import argparse
+import codecs
+import glob
+import os
+import re
+import string
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from text_pipeline import CHUNK_SIZE, ChunkProcessor
+
+SPLIT_SIZE = 64 << 20  # files bigger than this are shared between workers
+BATCH_FILES = 256  # most small files packed into one task
+
+# ASCII whitespace as str.split() sees it; byte ranges only ever start/end there
+_SPACE = re.compile(rb"[\t\n\x0b\x0c\r\x1c-\x1f ]")
+_PUNCTUATION = string.punctuation + "“”‘’«»…"
+
+
+def _matches(pattern):
+    return sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+
+
+def expand_inputs(patterns):
+    """Files for a list of paths, globs (** allowed) and directories, in order, without duplicates"""
+    files = {}
+    for pattern in patterns:
+        for path in _matches(pattern):
+            if os.path.isdir(path):
+                for root, dirs, names in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(names):
+                        files[os.path.join(root, name)] = None
+            else:
+                files[path] = None  # kept even if missing, so the error is reported
+    return list(files)
+
+
+def error_message(path, error):
+    """The week-4 error handling messages"""
+    if isinstance(error, FileNotFoundError):
+        return f"Error: File '{path}' not found!"
+    if isinstance(error, PermissionError):
+        return f"Error: No permission to read '{path}'!"
+    return f"Error: Could not read '{path}': {error}"
+
+
+def _glob_root(pattern):
+    """The leading part of a glob without wildcards: where it starts looking"""
+    while glob.has_magic(pattern):
+        pattern = os.path.dirname(pattern)
+    return pattern or os.curdir
+
+
+def input_roots(patterns):
+    """
+    Directories an input list reads from: (walked, listed).
+
+    walked: input directories (given or matched by a glob) and the start of
+    ** globs; every file below them is read. listed: the directories a plain
+    glob such as *.txt takes files from, without looking into their
+    subdirectories. A named file adds neither.
+    """
+    walked, listed = [], []
+    for pattern in patterns:
+        if glob.has_magic(pattern) and "**" in pattern:
+            walked.append(_glob_root(pattern))
+        for path in _matches(pattern):
+            if os.path.isdir(path):
+                walked.append(path)  # matched directories are read whole
+            elif glob.has_magic(pattern):
+                listed.append(os.path.dirname(path) or os.curdir)
+    return walked, listed
+
+
+def check_output_dir(output_dir, paths, walked=(), listed=()):
+    """
+    Refuse an output directory that would overwrite an input file or be read as input.
+
+    `paths` are the input files; `walked` and `listed` come from
+    input_roots(). The output directory may not be an input file, be inside
+    a walked directory or be a listed one. Raises ValueError with a message
+    for the user.
+    """
+    target = os.path.realpath(output_dir)
+    if target in {os.path.realpath(path) for path in paths if os.path.isfile(path)}:
+        raise ValueError(f"Error: Output directory '{output_dir}' is one of the input files!")
+    for folder in sorted({os.path.realpath(path) for path in walked}):
+        if os.path.commonpath([target, folder]) == folder:
+            raise ValueError(f"Error: Output directory '{output_dir}' is inside the input directory '{folder}'!")
+    for folder in sorted({os.path.realpath(path) for path in listed}):
+        if target == folder:
+            raise ValueError(f"Error: Output directory '{output_dir}' is the input directory '{folder}'!")
+
+
+def plan_tasks(paths, split_size=SPLIT_SIZE, whole_files=False):
+    """
+    Work for the pool: ([tasks], [(path, error message)]).
+
+    A task is a list of (path, start, end) byte ranges. Files above
+    split_size become several tasks of one range each (unless whole_files),
+    smaller files are packed together up to split_size bytes or BATCH_FILES
+    files per task. Tasks are returned biggest first, which keeps the workers
+    evenly busy towards the end of the run.
+    """
+    tasks, errors = [], []
+    batch, batch_bytes = [], 0
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+        except OSError as error:
+            errors.append((path, error_message(path, error)))
+            continue
+        if size > split_size and not whole_files:
+            tasks.extend([(path, start, min(start + split_size, size))] for start in range(0, size, split_size))
+            continue
+        batch.append((path, 0, size))
+        batch_bytes += size
+        if batch_bytes >= split_size or len(batch) >= BATCH_FILES:
+            tasks.append(batch)
+            batch, batch_bytes = [], 0
+    if batch:
+        tasks.append(batch)
+    tasks.sort(key=lambda ranges: sum(end - start for _, start, end in ranges), reverse=True)
+    return tasks, errors
+
+
+def _normalise(counts, ignore_case, strip_punctuation):
+    """Fold the counted words; done on the distinct words, not on every occurrence"""
+    folded = Counter()
+    for word, count in counts.items():
+        if strip_punctuation:
+            word = word.strip(_PUNCTUATION)
+        if ignore_case:
+            word = word.lower()
+        if word:
+            folded[word] += count
+    return folded
+
+
+def count_range(path, start, end, counts, output=None):
+    """
+    Add the words of bytes [start, end) of a file to `counts`; returns (words, bytes read).
+
+    A range owns the words that start inside it: if a word runs over `start`
+    it is left to the previous range, and a word running over `end` is read
+    to its end. Words are only cut at ASCII whitespace, which never occurs
+    inside a UTF-8 character. With `output` (a binary file, whole files
+    only) the text is also written uppercased.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    processor = ChunkProcessor(errors="replace") if output is not None else None
+    words = 0
+    carry = ""  # a word cut off at the end of the previous chunk
+    with open(path, "rb") as f:
+        position = start
+        if start:
+            f.seek(start - 1)
+            if not _SPACE.match(f.read(1)):  # inside a word that belongs to the previous range
+                while position < end:
+                    chunk = f.read(min(CHUNK_SIZE, end - position))
+                    if not chunk:
+                        break
+                    space = _SPACE.search(chunk)
+                    if space:
+                        position += space.start()
+                        break
+                    position += len(chunk)
+                f.seek(position)
+        in_word = False  # does the last byte read belong to a word?
+        while position < end:
+            chunk = f.read(min(CHUNK_SIZE, end - position))
+            if not chunk:
+                break
+            position += len(chunk)
+            in_word = not _SPACE.match(chunk[-1:])
+            if processor is not None:
+                output.write(processor.process(chunk))
+            text = carry + decoder.decode(chunk)
+            tokens = text.split()
+            carry = tokens.pop() if tokens and not text[-1].isspace() else ""
+            counts.update(tokens)
+            words += len(tokens)
+        if in_word and position == end:  # finish a word that runs over the end of the range
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                space = _SPACE.search(chunk)
+                carry += decoder.decode(chunk[:space.start()] if space else chunk)
+                if space:
+                    break
+        tokens = (carry + decoder.decode(b"", final=True)).split()
+        counts.update(tokens)
+        words += len(tokens)
+        if processor is not None:
+            output.write(processor.finish())
+            output.write(f"\n\nTOTAL WORD COUNT: {processor.words}".encode())
+    return words, position - start
+
+
+def _transform(path, start, end, counts, output_dir, root):
+    """count_range() with the uppercased text written below output_dir"""
+    target = os.path.join(output_dir, os.path.relpath(os.path.abspath(path), root))
+    if os.path.exists(target) and os.path.samefile(target, path):
+        raise ValueError(f"output '{target}' is the input file")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Written next to the target and renamed when complete, so a failed read
+    # leaves neither a truncated nor an empty output file
+    temporary = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as output:
+            result = count_range(path, start, end, counts, output)
+        os.replace(temporary, target)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return result
+
+
+def count_task(ranges, ignore_case=False, strip_punctuation=False, output_dir=None, root=None):
+    """
+    Worker: count the words of some byte ranges.
+
+    Returns a dict with the merged word counts, per-file word counts, errors,
+    bytes read, busy seconds and the worker's pid (for per-worker MB/s).
+    """
+    started = time.perf_counter()
+    counts = Counter()
+    result = {"pid": os.getpid(), "bytes": 0, "words": 0, "files": {}, "errors": []}
+    for path, start, end in ranges:
+        try:
+            if output_dir is None:
+                words, nbytes = count_range(path, start, end, counts)
+            else:
+                words, nbytes = _transform(path, start, end, counts, output_dir, root)
+        except (OSError, ValueError) as error:  # ValueError: e.g. the output would overwrite the input
+            result["errors"].append((path, error_message(path, error)))
+            continue
+        result["bytes"] += nbytes
+        result["words"] += words
+        result["files"][path] = result["files"].get(path, 0) + words
+    if ignore_case or strip_punctuation:
+        counts = _normalise(counts, ignore_case, strip_punctuation)
+    result["counts"] = counts
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def count_files(paths, workers=None, split_size=SPLIT_SIZE, ignore_case=False, strip_punctuation=False,
+                output_dir=None, on_error=None):
+    """
+    Count the words of many files in a process pool and merge the results.
+
+    Returns {"counts", "words", "bytes", "files", "errors", "workers",
+    "elapsed_s"}; "workers" maps each worker's pid to its tasks, bytes and
+    busy seconds. on_error(path, message) is called as soon as a file fails.
+    With workers=1 everything runs in this process.
+    """
+    started = time.perf_counter()
+    if output_dir is not None:
+        check_output_dir(output_dir, paths)
+    tasks, errors = plan_tasks(paths, split_size, whole_files=output_dir is not None)
+    found = {path for ranges in tasks for path, _, _ in ranges}
+    # --output-dir mirrors the input files below their deepest common directory
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in found]) if found else None
+    for path, message in errors:
+        if on_error:
+            on_error(path, message)
+
+    summary = {"counts": Counter(), "words": 0, "bytes": 0, "files": {}, "errors": dict(errors), "workers": {}}
+    options = (ignore_case, strip_punctuation, output_dir, root)
+
+    def merge(result):
+        summary["counts"].update(result["counts"])
+        summary["words"] += result["words"]
+        summary["bytes"] += result["bytes"]
+        for path, words in result["files"].items():
+            summary["files"][path] = summary["files"].get(path, 0) + words
+        for path, message in result["errors"]:
+            if path not in summary["errors"]:  # a split file fails once per range
+                summary["errors"][path] = message
+                if on_error:
+                    on_error(path, message)
+        worker = summary["workers"].setdefault(result["pid"], {"tasks": 0, "bytes": 0, "seconds": 0.0})
+        worker["tasks"] += 1
+        worker["bytes"] += result["bytes"]
+        worker["seconds"] += result["seconds"]
+
+    if workers == 1:
+        for task in tasks:
+            merge(count_task(task, *options))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(count_task, task, *options) for task in tasks]
+            for future in as_completed(futures):
+                merge(future.result())
+    for path in summary["errors"]:
+        summary["files"].pop(path, None)  # partly read split files do not count as done
+    summary["elapsed_s"] = time.perf_counter() - started
+    return summary
+
+
+def print_summary(summary, top=20):
+    elapsed = summary["elapsed_s"]
+    megabytes = summary["bytes"] / 1e6
+    print(f"\nFiles: {len(summary['files']):,} counted, {len(summary['errors']):,} failed")
+    print(f"Words: {summary['words']:,} ({len(summary['counts']):,} distinct)")
+    print(f"Read:  {megabytes:,.1f} MB in {elapsed:.2f} s ({megabytes / elapsed if elapsed else 0:,.1f} MB/s overall)")
+
+    print(f"\n{'worker':>8} {'tasks':>6} {'MB':>10} {'busy s':>8} {'MB/s':>8}")
+    for pid, worker in sorted(summary["workers"].items()):
+        rate = worker["bytes"] / 1e6 / worker["seconds"] if worker["seconds"] else 0.0
+        print(f"{pid:>8} {worker['tasks']:>6} {worker['bytes'] / 1e6:>10,.1f} {worker['seconds']:>8.2f} {rate:>8,.1f}")
+
+    if top:
+        print(f"\nTop {top} words")
+        print(f"{'rank':>4}  {'word':<24} {'count':>12} {'share':>7}")
+        for rank, (word, count) in enumerate(summary["counts"].most_common(top), 1):
+            share = count / summary["words"] * 100 if summary["words"] else 0.0
+            print(f"{rank:>4}  {word[:24]:<24} {count:>12,} {share:>6.2f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count words in many files in parallel")
+    parser.add_argument("inputs", nargs="+", help="files, directories or glob patterns (quote them, ** allowed)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=20, help="rows of the word frequency table")
+    parser.add_argument("--split-mb", type=float, default=SPLIT_SIZE / (1 << 20),
+                        help="share files bigger than this between workers (MiB)")
+    parser.add_argument("--ignore-case", action="store_true", help="count 'Python' and 'python' together")
+    parser.add_argument("--strip-punctuation", action="store_true", help="count 'python,' as 'python'")
+    parser.add_argument("--output-dir", help="also write every file uppercased (with its word count) here")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if args.output_dir:
+        try:
+            check_output_dir(args.output_dir, paths, *input_roots(args.inputs))
+        except ValueError as error:
+            parser.exit(2, f"{error}\n")
+    print(f"Counting words in {len(paths):,} file(s)")
+    summary = count_files(
+        paths, args.workers, int(args.split_mb * (1 << 20)), args.ignore_case, args.strip_punctuation,
+        args.output_dir, on_error=lambda path, message: print(message),
+    )
+    print_summary(summary, args.top)
+
+
+if __name__ == "__main__":
+    main()